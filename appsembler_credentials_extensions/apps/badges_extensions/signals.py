@@ -4,30 +4,40 @@
 from __future__ import absolute_import, unicode_literals
 
 from django.conf import settings
-from django.dispatch.dispatcher import receiver
-
-from xmodule.modulestore.django import SignalHandler, modulestore
 
 from appsembler_credentials_extensions.apps.badges_extensions import app_settings
+from appsembler_credentials_extensions.common import pre_publish
+from appsembler_credentials_extensions.common.helpers import make_fingerprint
 
 
-@receiver(SignalHandler.pre_publish)
-def _change_badges_setting_on_pre_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
-    """Turn off issue_badges on a course.
+def change_badges_setting(course, **kwargs):  # pylint: disable=unused-argument
+    """Pre-publish step to turn off issue_badges on a course.
 
     We do this if feature not enabled, or we explicitly disable course
     completion badges. At present, course completion badges don't work properly
     with Badgr so we use course group badging and have to turn off
     `issue_badges`.
     """
-
-    store = modulestore()
-    course = store.get_course(course_key)
     use_badges = settings.FEATURES.get('ENABLE_OPENBADGES', False)
     if not use_badges or app_settings.DISABLE_COURSE_COMPLETION_BADGES:
-        course.issue_badges = False
-    course.save()
-    try:
-        store.update_item(course, course._edited_by)
-    except AttributeError:
-        store.update_item(course, 0)
+        return pre_publish.set_fields(course, issue_badges=False)
+    return False
+
+
+def _change_badges_setting_on_pre_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """Turn off issue_badges on a single course.
+
+    On publish this runs as a step of the common pre_publish pipeline instead.
+    """
+    pre_publish.run_steps(course_key, [change_badges_setting])
+
+
+def _badges_setting_fingerprint(course_key):  # pylint: disable=unused-argument
+    """Digest of the configuration change_badges_setting applies to a course."""
+    return make_fingerprint(
+        settings.FEATURES.get('ENABLE_OPENBADGES', False),
+        app_settings.DISABLE_COURSE_COMPLETION_BADGES,
+    )
+
+
+pre_publish.register_step('badges.issue_badges', change_badges_setting, fingerprint=_badges_setting_fingerprint)
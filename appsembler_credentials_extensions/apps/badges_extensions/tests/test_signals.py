@@ -59,3 +59,11 @@ class BadgeSignalsTestCase(ModuleStoreTestCase):
             signals._change_badges_setting_on_pre_publish('store', self.course.id)
             course = self.store.get_course(self.course.id)
             self.assertFalse(course.issue_badges)
+
+    def test_no_course_write_when_issue_badges_unchanged(self):
+        """ Verify a pre-publish that changes nothing doesn't write the course again
+        """
+        signals._change_badges_setting_on_pre_publish('store', self.course.id)
+        with mock.patch('appsembler_credentials_extensions.common.pre_publish.update_course') as mock_update:
+            signals._change_badges_setting_on_pre_publish('store', self.course.id)
+            mock_update.assert_not_called()
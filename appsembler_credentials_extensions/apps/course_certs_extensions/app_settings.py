@@ -11,8 +11,13 @@ USE_OPEN_ENDED_CERTS_DEFAULTS = ENV_TOKENS.get("USE_OPEN_ENDED_CERTS_DEFAULTS",
 ACTIVATE_DEFAULT_CERTS = ENV_TOKENS.get("ACTIVATE_DEFAULT_CERTS", True)
 ALWAYS_ENABLE_SELF_GENERATED_CERTS = ENV_TOKENS.get("ALWAYS_ENABLE_SELF_GENERATED_CERTS", False)
 DISABLE_SELF_GENERATED_CERTS_FOR_SELF_PACED = ENV_TOKENS.get("DISABLE_SELF_GENERATED_CERTS_FOR_SELF_PACED", False)
+SELF_GENERATED_CERTS_TOGGLE_COUNTDOWN = ENV_TOKENS.get("SELF_GENERATED_CERTS_TOGGLE_COUNTDOWN", 10)
 CERTS_HTML_VIEW_CONFIGURATION = ENV_TOKENS.get("CERTS_HTML_VIEW_CONFIGURATION", None)
 LINKEDIN_ADDTOPROFILE_COMPANY_ID = ENV_TOKENS.get("LINKEDIN_ADDTOPROFILE_COMPANY_ID", None)
 LINKEDIN_ADDTOPROFILE_LICENSE_ID = ENV_TOKENS.get("LINKEDIN_ADDTOPROFILE_LICENSE_ID", None)
 DEFAULT_CERT_SIGNATORIES = ENV_TOKENS.get("DEFAULT_CERT_SIGNATORIES", None)
-CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES = ENV_TOKENS.get("CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES", {})
\ No newline at end of file
+CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES = ENV_TOKENS.get("CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES", {})
+RESOLVE_CERTS_HTML_VIEW_ORG_OVERRIDES_AT_RENDER = ENV_TOKENS.get("RESOLVE_CERTS_HTML_VIEW_ORG_OVERRIDES_AT_RENDER",
+                                                                 False)
+CACHE_CERTS_WEBVIEW_CONTEXT = ENV_TOKENS.get("CACHE_CERTS_WEBVIEW_CONTEXT", False)
+CERTS_WEBVIEW_CONTEXT_CACHE_TIMEOUT = ENV_TOKENS.get("CERTS_WEBVIEW_CONTEXT_CACHE_TIMEOUT", 60 * 5)
\ No newline at end of file
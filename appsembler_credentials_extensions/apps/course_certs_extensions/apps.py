@@ -19,9 +19,18 @@ class AppsemblerCredentialsCourseCertsConfig(AppConfig):
 
     def ready(self):
         """Do stuff after app is ready."""
-        from . import monkeypatch  # noqa
+        from . import monkeypatch
         from . import signals  # noqa
 
+        # forget cached webview organization context when organizations change, in whichever service edits them
+        monkeypatch.connect_organizations_signals()
+
+        if hasattr(settings, 'STUDIO_NAME'):  # cms, where default certificates are created
+            signals.compile_default_cert_templates()
+        else:  # lms, where certificates are rendered
+            from . import org_overrides
+            org_overrides.compile_org_html_view_overrides()
+
         # disable migrations outside of LMS environment
         if os.environ.get('SERVICE_VARIANT', '').lower() != 'lms':
             # starting Django 1.9 can just set this to `None`
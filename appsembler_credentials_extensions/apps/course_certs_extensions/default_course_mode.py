@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Cached check that a course has its CourseMode in the default mode.
+
+Courses known to have the default CourseMode are remembered in a small per-process
+LRU backed by the Django cache, so the check on every publish usually makes no query.
+Saving or deleting any CourseMode of a course forgets it.  Other processes may keep a
+forgotten course in their LRU for up to DEFAULT_MODE_LOCAL_TIMEOUT seconds.
+
+For catalog-wide fixes, provision_default_modes creates the default CourseMode for all
+courses missing it with bulk inserts, and change_audit_course_modes switches audit
+CourseModes to the default mode with chunked updates.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+from course_modes.models import CourseMode
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+
+DEFAULT_MODE_CACHE_KEY = 'appsembler_credentials.default_course_mode.{}'
+DEFAULT_MODE_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_MODE_LOCAL_TIMEOUT = 60
+DEFAULT_MODE_LRU_SIZE = 1000
+PROVISION_CHUNK_SIZE = 1000
+AUDIT_MODE_CHUNK_SIZE = 1000
+
+# per-process LRU of course key strings known to have the default mode: course key -> expiry time
+_courses_with_default_mode = OrderedDict()
+
+
+def _remember_locally(course_key_string):
+    """Add a course to the per-process LRU, evicting the least recently used course if full."""
+    _courses_with_default_mode.pop(course_key_string, None)
+    _courses_with_default_mode[course_key_string] = time.time() + DEFAULT_MODE_LOCAL_TIMEOUT
+    while len(_courses_with_default_mode) > DEFAULT_MODE_LRU_SIZE:
+        _courses_with_default_mode.popitem(last=False)
+
+
+def is_known_to_have_default_mode(course_key):
+    """Return True if the course is cached as having the default CourseMode."""
+    course_key_string = unicode(course_key)
+    expiry = _courses_with_default_mode.pop(course_key_string, None)
+    if expiry is not None and expiry > time.time():
+        _courses_with_default_mode[course_key_string] = expiry
+        return True
+    if cache.get(DEFAULT_MODE_CACHE_KEY.format(course_key_string)):
+        _remember_locally(course_key_string)
+        return True
+    return False
+
+
+def remember_default_mode(course_key):
+    """Cache the course as having the default CourseMode."""
+    course_key_string = unicode(course_key)
+    cache.set(DEFAULT_MODE_CACHE_KEY.format(course_key_string), True, DEFAULT_MODE_CACHE_TIMEOUT)
+    _remember_locally(course_key_string)
+
+
+def forget_default_mode(course_key):
+    """Drop the course from the cache, so its default CourseMode is checked again."""
+    course_key_string = unicode(course_key)
+    cache.delete(DEFAULT_MODE_CACHE_KEY.format(course_key_string))
+    _courses_with_default_mode.pop(course_key_string, None)
+
+
+def ensure_default_mode(course_key):
+    """Create a CourseMode in the default mode for the course, unless it is known to have one."""
+    if is_known_to_have_default_mode(course_key):
+        return
+    CourseMode.objects.get_or_create(
+        course_id=course_key,
+        mode_slug=CourseMode.DEFAULT_MODE_SLUG,
+        mode_display_name=CourseMode.DEFAULT_MODE.name,
+        min_price=CourseMode.DEFAULT_MODE.min_price,
+        currency=CourseMode.DEFAULT_MODE.currency
+    )
+    remember_default_mode(course_key)
+
+
+def get_courses_missing_default_mode():
+    """Return the keys of courses with a CourseOverview but no CourseMode in the default mode, in one query."""
+    with_default_mode = CourseMode.objects.filter(mode_slug=CourseMode.DEFAULT_MODE_SLUG).values('course_id')
+    return list(CourseOverview.objects.exclude(id__in=with_default_mode).order_by('id').values_list('id', flat=True))
+
+
+def provision_default_modes(course_keys=None, chunk_size=PROVISION_CHUNK_SIZE):
+    """
+    Create a CourseMode in the default mode for each course missing one, in chunked bulk inserts.
+
+    Provisions the given course keys, which must be missing the default mode, or all courses
+    missing it.  Returns the number of CourseModes created.
+    """
+    if course_keys is None:
+        course_keys = get_courses_missing_default_mode()
+    created = 0
+    for start in range(0, len(course_keys), chunk_size):
+        chunk = course_keys[start:start + chunk_size]
+        CourseMode.objects.bulk_create([
+            CourseMode(
+                course_id=course_key,
+                mode_slug=CourseMode.DEFAULT_MODE_SLUG,
+                mode_display_name=CourseMode.DEFAULT_MODE.name,
+                min_price=CourseMode.DEFAULT_MODE.min_price,
+                currency=CourseMode.DEFAULT_MODE.currency
+            ) for course_key in chunk
+        ])
+        created += len(chunk)
+    return created
+
+
+def change_audit_course_modes(course_mode_model, mode_slug, mode_display_name, chunk_size=AUDIT_MODE_CHUNK_SIZE,
+                              progress=None):
+    """
+    Switch any audit course modes to the given mode, a chunk of rows per update query.
+
+    Takes the CourseMode model class to update.  Rows are paged through by primary key, so
+    each is visited once.  Audit modes of courses which already have the given mode in the
+    same currency are left alone, as are all of them if the given mode is audit.  Calls
+    progress, if given, with the running count of updated course modes after each chunk.
+    Returns the number of course modes updated.
+    """
+    updated = 0
+    if mode_slug == 'audit':
+        return updated
+    last_pk = 0
+    while True:
+        rows = list(course_mode_model.objects.filter(mode_slug='audit', pk__gt=last_pk).order_by('pk').values_list(
+            'pk', 'course_id', 'currency')[:chunk_size])
+        if not rows:
+            return updated
+        last_pk = rows[-1][0]
+        # switching these would violate the unique (course_id, mode_slug, currency) constraint
+        taken = set(course_mode_model.objects.filter(
+            course_id__in=set(course_id for _, course_id, _ in rows), mode_slug=mode_slug
+        ).values_list('course_id', 'currency'))
+        ids = [pk for pk, course_id, currency in rows if (course_id, currency) not in taken]
+        if ids:
+            updated += course_mode_model.objects.filter(pk__in=ids).update(
+                mode_slug=mode_slug, mode_display_name=mode_display_name)
+        if progress is not None:
+            progress(updated)
+
+
+@receiver(post_save, sender=CourseMode, dispatch_uid="appsembler_default_course_mode_saved")
+@receiver(post_delete, sender=CourseMode, dispatch_uid="appsembler_default_course_mode_deleted")
+def _forget_default_mode_on_course_mode_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Forget whether the course of a saved or deleted CourseMode has the default mode."""
+    forget_default_mode(instance.course_id)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Apply a configuration for the HTML view of course certificates."""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import logging
+
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def apply_html_view_configuration(html_view_config_model, config):
+    """
+    Disable all old HTML View Configurations in one query, then create and enable one for config.
+
+    Takes the CertificateHtmlViewConfiguration model class.  Does nothing if config is already
+    the enabled configuration.  Returns True if a new configuration was created.
+    """
+    with transaction.atomic():
+        enabled = html_view_config_model.objects.filter(enabled=True)
+        if [json.loads(configuration) for configuration in enabled.values_list('configuration', flat=True)] == [config]:
+            logger.info('HTML View Configuration for certs is already current')
+            return False
+        enabled.update(enabled=False)
+        logger.info('Disabled old HTML View Configurations for certs')
+        # saving the new configuration clears the ConfigurationModel cache of the current one
+        html_view_config_model(configuration=json.dumps(config), enabled=True).save()
+    return True
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Change audit course modes.
+Switch any audit course modes to the default mode, as the 0001 data migration does, with chunked updates.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from course_modes.models import CourseMode
+
+from appsembler_credentials_extensions.apps.course_certs_extensions import default_course_mode
+
+
+class Command(BaseCommand):
+    """Command to switch any audit course modes to the default mode.
+
+    Examples:
+        ./manage.py change_audit_course_modes - switches audit course modes to the default mode
+        ./manage.py change_audit_course_modes --chunk-size 500 - updates 500 course modes per query
+    """
+    help = dedent(__doc__)
+
+    can_import_settings = True
+
+    chunk_size_option = make_option('--chunk-size',
+                                    action='store',
+                                    dest='chunk_size',
+                                    type='int',
+                                    default=default_course_mode.AUDIT_MODE_CHUNK_SIZE,
+                                    help='Number of course modes to update per query')
+
+    option_list = BaseCommand.option_list + (chunk_size_option,)
+
+    def handle(self, *args, **options):
+        """Update audit course modes a chunk at a time, reporting progress."""
+        chunk_size = options.get('chunk_size') or default_course_mode.AUDIT_MODE_CHUNK_SIZE
+        if chunk_size < 1:
+            raise CommandError(u"--chunk-size must be at least 1")
+
+        updated = default_course_mode.change_audit_course_modes(
+            CourseMode,
+            settings.COURSE_MODE_DEFAULTS['slug'],
+            settings.COURSE_MODE_DEFAULTS['name'],
+            chunk_size=chunk_size,
+            progress=lambda count: self.stdout.write(u"Updated {} course mode(s)...".format(count))
+        )
+        self.stdout.write(u"Switched {} audit course mode(s) to the default mode.".format(updated))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Configure certificate HTML view.
+Apply CERTS_HTML_VIEW_CONFIGURATION, or a configuration from a JSON file, as the 0003 data migration does.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+from optparse import make_option
+from textwrap import dedent
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from certificates.models import CertificateHtmlViewConfiguration
+
+from appsembler_credentials_extensions.apps.course_certs_extensions import app_settings, html_view_config
+
+
+class Command(BaseCommand):
+    """Command to disable old HTML View Configurations for certs and enable a new one.
+
+    Examples:
+        ./manage.py configure_certificate_html_view - applies CERTS_HTML_VIEW_CONFIGURATION from the env
+        ./manage.py configure_certificate_html_view --config-file config.json - applies the configuration in the file
+    """
+    help = dedent(__doc__)
+
+    can_import_settings = True
+
+    config_file_option = make_option('--config-file',
+                                     action='store',
+                                     dest='config_file',
+                                     default=None,
+                                     help='JSON file with the configuration to apply instead of the env setting')
+
+    option_list = BaseCommand.option_list + (config_file_option,)
+
+    def handle(self, *args, **options):
+        """Apply the configuration, unless it is already the enabled one."""
+        if not settings.FEATURES.get('CERTIFICATES_HTML_VIEW', False):
+            raise CommandError(u"CERTIFICATES_HTML_VIEW is not enabled")
+
+        config_file = options.get('config_file')
+        if config_file:
+            try:
+                with open(config_file) as config_json:
+                    config = json.load(config_json)
+            except (IOError, ValueError) as exc:
+                raise CommandError(u"Could not read configuration {}: {}".format(config_file, exc))
+        else:
+            config = app_settings.CERTS_HTML_VIEW_CONFIGURATION
+        if not config:
+            raise CommandError(u"No configuration to apply.  Set CERTS_HTML_VIEW_CONFIGURATION in your "
+                               u"lms/cms.env.json or pass --config-file")
+
+        if html_view_config.apply_html_view_configuration(CertificateHtmlViewConfiguration, config):
+            self.stdout.write(u"Enabled a new HTML View Configuration for certs.")
+        else:
+            self.stdout.write(u"HTML View Configuration for certs is already current.")
@@ -6,10 +6,13 @@ Run all pre-/ and publish handlers to set up existing courses.  Doesn't actually
 
 from __future__ import absolute_import, unicode_literals
 
+import json
 import logging
+from multiprocessing import BoundedSemaphore, Pool
 from optparse import make_option
 from textwrap import dedent
 
+from django import db
 from django.core.management import BaseCommand, CommandError
 
 from opaque_keys.edx.keys import CourseKey
@@ -18,13 +21,74 @@ from opaque_keys.edx.locator import CourseLocator
 
 from contentstore.management.commands.prompt import query_yes_no
 
-from xmodule.modulestore.django import modulestore
+from xmodule.contentstore import django as contentstore_django
+from xmodule.modulestore.django import clear_existing_modulestores, modulestore
 
-from appsembler_credentials_extensions.apps.course_certs_extensions import signals
+from appsembler_credentials_extensions.apps.course_certs_extensions import planning, signals
+from appsembler_credentials_extensions.apps.course_certs_extensions.models import (
+    CourseExtensionsState,
+    CourseSetupJournalEntry,
+)
+from appsembler_credentials_extensions.apps.course_certs_extensions.throttling import RateLimiter, WriteThrottle
+from appsembler_credentials_extensions.common import pre_publish
 
 
 logger = logging.getLogger(__name__)
 
+COURSE_NOT_FOUND_ERROR = 'Course not found in the modulestore'
+
+# number of set up courses to toggle self-generated certs for per batched task
+SELF_GENERATED_CERTS_CHUNK_SIZE = 500
+
+# throttle around each course's writes in this process; set up by Command.handle or _init_worker
+_write_throttle = WriteThrottle()
+
+
+def setup_course(course_key_string, replace_certs):
+    """Run all per-course setup for one course.
+
+    Returns a (course key string, error message) tuple, the error being None on success.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    try:
+        store = modulestore()
+        # keys may come from stale CourseOverview rows or arguments, so don't write anything for missing courses
+        if not store.has_course(course_key):
+            return course_key_string, COURSE_NOT_FOUND_ERROR
+        with _write_throttle:
+            # run the pre_publish handler and steps against one load of the course;
+            # self-generated certs are toggled for set up courses in batches by the command
+            signals._default_mode_on_course_pre_publish(store.__class__, course_key)
+            written = pre_publish.run_all_steps(
+                course_key,
+                replace=replace_certs,
+                force=True  # always force when using command
+            )
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception('Failed to set up course {}'.format(course_key_string))
+        return course_key_string, '{}: {}'.format(exc.__class__.__name__, exc)
+    if written is None:
+        return course_key_string, COURSE_NOT_FOUND_ERROR
+    return course_key_string, None
+
+
+def _setup_course_star(args):
+    """Unpack arguments for setup_course, for Pool.imap_unordered."""
+    return setup_course(*args)
+
+
+def _set_write_throttle(write_throttle):
+    """Set the throttle around each course's writes in this process."""
+    global _write_throttle  # pylint: disable=global-statement
+    _write_throttle = write_throttle
+
+
+def _init_worker(write_throttle):
+    """Make a worker process open its own modulestore and contentstore connections."""
+    _set_write_throttle(write_throttle)
+    clear_existing_modulestores()
+    contentstore_django._CONTENTSTORE.clear()  # pylint: disable=protected-access
+
 
 class Command(BaseCommand):
     """Command to run all appsembler_course_extensions per-course setup.
@@ -33,6 +97,12 @@ class Command(BaseCommand):
         ./manage.py create_course_certificates <course_id_1> <course_id_2> - creates certs in courses with keys course_id_1 and course_id_2  # noqa
         ./manage.py create_course_certificates --all - creates certs in all available courses
         ./manage.py create_course_certificates --all --replace - creates or replaces certs in all available courses
+        ./manage.py create_course_certificates --all --workers 8 - sets up all courses in 8 worker processes
+        ./manage.py create_course_certificates --all --journal nightly - records progress of the run named 'nightly'
+        ./manage.py create_course_certificates --all --journal nightly --resume - skips courses already set up by it
+        ./manage.py create_course_certificates --all --workers 4 --max-courses-per-second 2 --max-inflight-writes 2 --adaptive-backoff - throttled run for a live cluster  # noqa
+        ./manage.py create_course_certificates --all --plan --plan-output plan.json - reports courses needing setup, without changing anything  # noqa
+        ./manage.py create_course_certificates --from-plan plan.json - sets up only the courses in a saved plan
     """
     help = dedent(__doc__)
 
@@ -55,8 +125,61 @@ class Command(BaseCommand):
                                   dest='no_input',
                                   default=False,
                                   help='Don\'t require manual confirmation')
+    workers_option = make_option('--workers',
+                                 action='store',
+                                 dest='workers',
+                                 type='int',
+                                 default=1,
+                                 help='Number of worker processes to set up courses in parallel')
+
+    journal_option = make_option('--journal',
+                                 action='store',
+                                 dest='journal',
+                                 default=None,
+                                 help='Name of the run, to record the progress of each course under')
+    resume_option = make_option('--resume',
+                                action='store_true',
+                                dest='resume',
+                                default=False,
+                                help='Skip courses already set up successfully by the --journal run')
+
+    max_rate_option = make_option('--max-courses-per-second',
+                                  action='store',
+                                  dest='max_courses_per_second',
+                                  type='float',
+                                  default=None,
+                                  help='Maximum number of courses to start setting up per second')
+    max_inflight_option = make_option('--max-inflight-writes',
+                                      action='store',
+                                      dest='max_inflight_writes',
+                                      type='int',
+                                      default=None,
+                                      help='Maximum number of courses being written at the same time across workers')
+    backoff_option = make_option('--adaptive-backoff',
+                                 action='store_true',
+                                 dest='adaptive_backoff',
+                                 default=False,
+                                 help='Pause between courses while course setup time is well above its average')
 
-    option_list = BaseCommand.option_list + (all_option, replace_option, no_input_option)
+    plan_option = make_option('--plan',
+                              action='store_true',
+                              dest='plan',
+                              default=False,
+                              help='Only report which courses need setup and why, without writing anything')
+    plan_output_option = make_option('--plan-output',
+                                     action='store',
+                                     dest='plan_output',
+                                     default=None,
+                                     help='File to write the --plan results to as JSON')
+    from_plan_option = make_option('--from-plan',
+                                   action='store',
+                                   dest='from_plan',
+                                   default=None,
+                                   help='Set up only the courses in a JSON file written by --plan-output')
+
+    option_list = BaseCommand.option_list + (all_option, replace_option, no_input_option, workers_option,
+                                             journal_option, resume_option, max_rate_option, max_inflight_option,
+                                             backoff_option, plan_option, plan_output_option, from_plan_option)
 
     CONFIRMATION_PROMPT = u"Setting up all courses might be a time consuming operation. Do you want to continue?"
     REPLACE_CONFIRMATION_PROMPT = (u"Are you sure you want to replace all existing certificates?  "
@@ -83,24 +206,25 @@ class Command(BaseCommand):
         no_input = options.get('no_input', False)
         replace_certs = False
 
-        if len(args) == 0 and not all_option:
-            raise CommandError(u"create_course_certificates requires one or more arguments: <course_id>, or --all")
+        from_plan = options.get('from_plan')
 
-        store = modulestore()
+        if len(args) == 0 and not all_option and not from_plan:
+            raise CommandError(u"create_course_certificates requires one or more arguments: <course_id>, "
+                               u"--all or --from-plan")
+
+        if options.get('plan', False):
+            course_keys = None if all_option else map(self._parse_course_key, args)
+            self._plan(course_keys, replace_option, options.get('plan_output'))
+            return
 
-        if all_option:
+        if from_plan:
+            course_keys = self._load_plan(from_plan)
+        elif all_option:
             # if reindexing is done during devstack setup step, don't prompt the user
             if no_input or query_yes_no(self.CONFIRMATION_PROMPT, default="no"):
-                # in case of --all, get the list of course keys from all courses
-                # that are stored in the modulestore
-                course_keys = []
-                try:
-                    for course in store.get_courses():
-                        course_keys.append(course.id)
-                except AttributeError, e:
-                    if 'HiddenDescriptor' in e.message:
-                        logger.warn('Failed on hidden course without id attr')
-                    pass
+                # in case of --all, lazily page through the keys of all courses
+                # without loading any course from the modulestore
+                course_keys = planning.iter_course_keys()
             else:
                 return
         else:
@@ -110,19 +234,112 @@ class Command(BaseCommand):
         if replace_option:
             if no_input or query_yes_no(self.REPLACE_CONFIRMATION_PROMPT, default="no"):
                 replace_certs = True
-                # set active_default_cert_created to False for courses
-                for key in course_keys:
-                    course = store.get_course(key)
-                    course.active_default_cert_created = False
-                    course.save()
+                # forget recorded setup state so the next publish re-checks these courses
+                CourseExtensionsState.clear(None if all_option and not from_plan else course_keys)
+
+        workers = options.get('workers') or 1
+        if workers < 1:
+            raise CommandError(u"--workers must be at least 1")
+
+        self.journal = options.get('journal')
+        self.skipped = 0
+        completed = set()
+        if options.get('resume', False):
+            if not self.journal:
+                raise CommandError(u"--resume requires --journal")
+            completed = CourseSetupJournalEntry.get_completed_courses(self.journal)
+
+        max_courses_per_second = options.get('max_courses_per_second')
+        max_inflight_writes = options.get('max_inflight_writes')
+        if max_courses_per_second is not None and max_courses_per_second <= 0:
+            raise CommandError(u"--max-courses-per-second must be greater than 0")
+        if max_inflight_writes is not None and max_inflight_writes < 1:
+            raise CommandError(u"--max-inflight-writes must be at least 1")
+        rate_limiter = RateLimiter(max_courses_per_second) if max_courses_per_second else None
+        semaphore = BoundedSemaphore(max_inflight_writes) if max_inflight_writes else None
+        write_throttle = WriteThrottle(semaphore, adaptive=options.get('adaptive_backoff', False))
+
+        tasks = ((course_key_string, replace_certs) for course_key_string in
+                 self._throttle(self._skip_completed(course_keys, completed), rate_limiter))
+        if workers == 1:
+            _set_write_throttle(write_throttle)
+            results = (_setup_course_star(task_args) for task_args in tasks)
+            self._report(results)
+        else:
+            # don't share this process's database connections with the forked workers
+            db.connections.close_all()
+            pool = Pool(processes=workers, initializer=_init_worker, initargs=(write_throttle,))
+            try:
+                self._report(pool.imap_unordered(_setup_course_star, tasks))
+            finally:
+                pool.close()
+                pool.join()
+
+    def _plan(self, course_keys, replace, plan_output):
+        """Write which courses need setup and the counts of courses per needed check."""
+        counts = dict((check, 0) for check in planning.CHECKS)
+        courses = []
+        for course_key, needed in planning.plan_courses(course_keys, replace=replace):
+            courses.append((unicode(course_key), needed))
+            for check in needed:
+                counts[check] += 1
+            self.stdout.write(u"{}: {}".format(course_key, ", ".join(needed)))
+
+        self.stdout.write(u"{} course(s) need setup.".format(len(courses)))
+        for check in planning.CHECKS:
+            self.stdout.write(u"  {}: {}".format(check, counts[check]))
 
+        if plan_output:
+            with open(plan_output, 'w') as plan_file:
+                json.dump({'counts': counts, 'courses': dict(courses)}, plan_file, indent=2, sort_keys=True)
+
+    def _load_plan(self, plan_file_path):
+        """Return the course keys in a plan written by --plan-output."""
+        try:
+            with open(plan_file_path) as plan_file:
+                plan = json.load(plan_file)
+        except (IOError, ValueError) as exc:
+            raise CommandError(u"Could not read plan {}: {}".format(plan_file_path, exc))
+        return [self._parse_course_key(course_key) for course_key in sorted(plan.get('courses', {}))]
+
+    def _skip_completed(self, course_keys, completed):
+        """Yield course key strings, skipping those in completed."""
         for course_key in course_keys:
-            # call functions that are normally signal handlers
-            signals._change_cert_defaults_on_pre_publish(store.__class__, course_key)
-            signals.enable_self_generated_certs(store.__class__, course_key)
-            signals._make_default_active_certificate(
-                store.__class__,
-                course_key,
-                replace_certs,
-                True  # always force when using command
-            )
+            course_key_string = unicode(course_key)
+            if course_key_string in completed:
+                self.skipped += 1
+                continue
+            yield course_key_string
+
+    def _throttle(self, course_key_strings, rate_limiter):
+        """Yield course key strings no faster than the rate limiter allows."""
+        for course_key_string in course_key_strings:
+            if rate_limiter is not None:
+                rate_limiter.wait()
+            yield course_key_string
+
+    def _report(self, results):
+        """Consume per-course results, then write a summary and fail if any course failed."""
+        succeeded = 0
+        failed = []
+        pending_toggles = []
+        for course_key_string, error in results:
+            if self.journal:
+                CourseSetupJournalEntry.record(self.journal, course_key_string, error)
+            if error is None:
+                succeeded += 1
+                pending_toggles.append(course_key_string)
+                if len(pending_toggles) >= SELF_GENERATED_CERTS_CHUNK_SIZE:
+                    signals.enable_self_generated_certs_for_courses(pending_toggles)
+                    pending_toggles = []
+            else:
+                failed.append((course_key_string, error))
+        if pending_toggles:
+            signals.enable_self_generated_certs_for_courses(pending_toggles)
+
+        self.stdout.write(u"Set up {} course(s), {} failed, {} skipped as already done.".format(
+            succeeded, len(failed), self.skipped))
+        for course_key_string, error in failed:
+            self.stdout.write(u"  {}: {}".format(course_key_string, error))
+        if failed:
+            raise CommandError(u"Setup failed for {} course(s)".format(len(failed)))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Create default course modes.
+Create a CourseMode in the default mode for every course missing one, with bulk inserts.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management import BaseCommand, CommandError
+
+from appsembler_credentials_extensions.apps.course_certs_extensions import default_course_mode
+
+
+class Command(BaseCommand):
+    """Command to create a CourseMode in the default mode for all courses missing one.
+
+    Examples:
+        ./manage.py create_default_course_modes - creates the default mode for courses missing it
+        ./manage.py create_default_course_modes --dry-run - only counts the courses missing the default mode
+    """
+    help = dedent(__doc__)
+
+    can_import_settings = True
+
+    dry_run_option = make_option('--dry-run',
+                                 action='store_true',
+                                 dest='dry_run',
+                                 default=False,
+                                 help='Only report how many courses are missing the default mode')
+    chunk_size_option = make_option('--chunk-size',
+                                    action='store',
+                                    dest='chunk_size',
+                                    type='int',
+                                    default=default_course_mode.PROVISION_CHUNK_SIZE,
+                                    help='Number of course modes to insert per query')
+
+    option_list = BaseCommand.option_list + (dry_run_option, chunk_size_option)
+
+    def handle(self, *args, **options):
+        """Find the courses missing the default mode and create it for them."""
+        chunk_size = options.get('chunk_size') or default_course_mode.PROVISION_CHUNK_SIZE
+        if chunk_size < 1:
+            raise CommandError(u"--chunk-size must be at least 1")
+
+        course_keys = default_course_mode.get_courses_missing_default_mode()
+        if options.get('dry_run', False):
+            self.stdout.write(u"{} course(s) missing the default course mode.".format(len(course_keys)))
+            return
+
+        created = default_course_mode.provision_default_modes(course_keys, chunk_size=chunk_size)
+        self.stdout.write(u"Created the default course mode for {} course(s).".format(created))
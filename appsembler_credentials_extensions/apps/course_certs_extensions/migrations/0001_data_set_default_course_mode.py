@@ -6,21 +6,38 @@ from django.conf import settings
 from django.db import migrations
 
 
+# number of course modes to update per query
+CHUNK_SIZE = 1000
+
+
 def get_models(apps):
     CourseMode = apps.get_model("course_modes", "CourseMode")
     return (CourseMode,)
 
 
 def change_audit_course_modes(apps, schema_editor):
-    """switch any audit course modes to our default mode slug.
+    """switch any audit course modes to our default mode slug, a chunk of rows per update query.
     """
     (CourseMode, ) = get_models(apps)
 
-    for cm in CourseMode.objects.all():
-        if cm.mode_slug == 'audit':
-            cm.mode_slug = settings.COURSE_MODE_DEFAULTS['slug']
-            cm.mode_display_name = settings.COURSE_MODE_DEFAULTS['name']
-            cm.save()
+    mode_slug = settings.COURSE_MODE_DEFAULTS['slug']
+    if mode_slug == 'audit':
+        return
+
+    last_pk = 0
+    while True:
+        rows = list(CourseMode.objects.filter(mode_slug='audit', pk__gt=last_pk).order_by('pk').values_list(
+            'pk', 'course_id', 'currency')[:CHUNK_SIZE])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        # leave audit modes of courses which already have the default mode, as the constraint is unique
+        taken = set(CourseMode.objects.filter(
+            course_id__in=set(course_id for _, course_id, _ in rows), mode_slug=mode_slug
+        ).values_list('course_id', 'currency'))
+        ids = [pk for pk, course_id, currency in rows if (course_id, currency) not in taken]
+        CourseMode.objects.filter(pk__in=ids).update(
+            mode_slug=mode_slug, mode_display_name=settings.COURSE_MODE_DEFAULTS['name'])
 
 
 class Migration(migrations.Migration):
@@ -5,7 +5,7 @@ from __future__ import absolute_import, unicode_literals
 import json
 import logging
 
-from django.db import migrations
+from django.db import migrations, transaction
 
 from appsembler_credentials_extensions.apps.course_certs_extensions.helpers import disable_if_certs_feature_off
 from appsembler_credentials_extensions.apps.course_certs_extensions import app_settings
@@ -32,17 +32,15 @@ def configure_course_certificate_html_view(apps, schema_editor):
                     )
         return
 
-    # disable all old configs
-    try:
-        existing_configs = CertificateHtmlViewConfiguration.objects.all()
-        for old in existing_configs:
-            old.enabled = False
-            old.save()
+    with transaction.atomic():
+        enabled = CertificateHtmlViewConfiguration.objects.filter(enabled=True)
+        if [json.loads(configuration) for configuration in enabled.values_list('configuration', flat=True)] == [config]:
+            logger.info('HTML View Configuration for certs is already current')
+            return
+        # disable all old configs in one query
+        enabled.update(enabled=False)
         logger.info('Disabled old HTML View Configurations for certs')
-    except CertificateHtmlViewConfiguration.DoesNotExist:
-        pass
-    newconf = CertificateHtmlViewConfiguration(configuration=json.dumps(config), enabled=True)
-    newconf.save()
+        CertificateHtmlViewConfiguration(configuration=json.dumps(config), enabled=True).save()
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+try:
+    from opaque_keys.edx.django.models import CourseKeyField
+except ImportError:
+    from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appsembler_course_certs_extensions', '0003_data_create_certificate_html_view_config'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseExtensionsState',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('course_id', CourseKeyField(max_length=255, db_index=True)),
+                ('step', models.CharField(max_length=100)),
+                ('fingerprint', models.CharField(max_length=40)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='courseextensionsstate',
+            unique_together=set([('course_id', 'step')]),
+        ),
+    ]
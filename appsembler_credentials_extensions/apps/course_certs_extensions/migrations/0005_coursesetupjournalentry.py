@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+try:
+    from opaque_keys.edx.django.models import CourseKeyField
+except ImportError:
+    from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appsembler_course_certs_extensions', '0004_courseextensionsstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSetupJournalEntry',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('run_id', models.CharField(max_length=100, db_index=True)),
+                ('course_id', CourseKeyField(max_length=255)),
+                ('succeeded', models.BooleanField(default=False)),
+                ('error', models.TextField(default='', blank=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='coursesetupjournalentry',
+            unique_together=set([('run_id', 'course_id')]),
+        ),
+    ]
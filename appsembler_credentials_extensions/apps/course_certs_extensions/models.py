@@ -4,3 +4,89 @@ Database models for appsembler_credentials_course_certs.
 """
 
 from __future__ import absolute_import, unicode_literals
+
+from django.db import models
+
+from model_utils.models import TimeStampedModel
+from opaque_keys.edx.keys import CourseKey
+
+try:
+    from opaque_keys.edx.django.models import CourseKeyField
+except ImportError:
+    from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
+
+
+class CourseExtensionsState(TimeStampedModel):
+    """
+    Record of a pre_publish setup step having been applied to a course.
+
+    The fingerprint identifies the configuration the step ran under, so a step only
+    needs to run again on publish if its configuration changed since then.
+    """
+
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    step = models.CharField(max_length=100)
+    fingerprint = models.CharField(max_length=40)
+
+    class Meta(object):
+        app_label = 'appsembler_course_certs_extensions'
+        unique_together = (('course_id', 'step'),)
+
+    def __unicode__(self):
+        return '{}: {} ({})'.format(self.course_id, self.step, self.fingerprint)
+
+    @classmethod
+    def get_applied_steps(cls, course_key):
+        """Return a dict of step name to fingerprint for steps applied to the course."""
+        return dict(cls.objects.filter(course_id=course_key).values_list('step', 'fingerprint'))
+
+    @classmethod
+    def mark_applied(cls, course_key, fingerprints):
+        """Record steps as applied to the course, given a dict of step name to fingerprint."""
+        for step, fingerprint in fingerprints.items():
+            cls.objects.update_or_create(course_id=course_key, step=step, defaults={'fingerprint': fingerprint})
+
+    @classmethod
+    def clear(cls, course_keys=None):
+        """Forget applied steps for the given courses, or for all courses, so they run on next publish."""
+        states = cls.objects.all()
+        if course_keys is not None:
+            states = states.filter(course_id__in=course_keys)
+        states.delete()
+
+
+class CourseSetupJournalEntry(TimeStampedModel):
+    """
+    Progress record of a course set up by a named create_course_certificates run.
+
+    Lets an interrupted run be resumed without setting up completed courses again.
+    """
+
+    run_id = models.CharField(max_length=100, db_index=True)
+    course_id = CourseKeyField(max_length=255)
+    succeeded = models.BooleanField(default=False)
+    error = models.TextField(blank=True, default='')
+
+    class Meta(object):
+        app_label = 'appsembler_course_certs_extensions'
+        unique_together = (('run_id', 'course_id'),)
+
+    def __unicode__(self):
+        return '{}: {} ({})'.format(self.run_id, self.course_id, 'succeeded' if self.succeeded else 'failed')
+
+    @classmethod
+    def get_completed_courses(cls, run_id):
+        """Return the set of course key strings successfully set up by the run."""
+        completed = cls.objects.filter(run_id=run_id, succeeded=True).values_list('course_id', flat=True)
+        return set(unicode(course_key) for course_key in completed)
+
+    @classmethod
+    def record(cls, run_id, course_key, error=None):
+        """Record the outcome of setting up a course in the run."""
+        if not isinstance(course_key, CourseKey):
+            course_key = CourseKey.from_string(course_key)
+        cls.objects.update_or_create(
+            run_id=run_id,
+            course_id=course_key,
+            defaults={'succeeded': error is None, 'error': error or ''}
+        )
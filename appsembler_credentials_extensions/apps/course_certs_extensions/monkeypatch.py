@@ -3,15 +3,26 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import copy
 import logging
+import uuid
 
+from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import get_language
 
 # both are in sys.modules and need to be monkeypatched
 from lms.djangoapps.certificates.signals import toggle_self_generated_certs as toggle_self_generated_certs_fullpath
 from certificates.signals import toggle_self_generated_certs
 
 from appsembler_credentials_extensions.common.course_extensions.mixins import get_CourseDescriptor_mixins
+from appsembler_credentials_extensions.common.helpers import make_fingerprint
+from appsembler_credentials_extensions.common.import_hooks import when_imported
+
+from . import app_settings
+from . import org_overrides
 
 
 logger = logging.getLogger(__name__)
@@ -21,23 +32,215 @@ if hasattr(settings, 'STUDIO_NAME'):  # cms
     cms_import_helper()
 
 
+WEBVIEW_MODULE = 'lms.djangoapps.certificates.views.webview'
+
+# cache of course extension field values for the webview, per course and published version
+EXTENSION_FIELDS_CACHE_KEY = 'appsembler_credentials.webview_extension_fields.{}'
+EXTENSION_FIELDS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# caches of the course and organization parts of the webview context, if enabled by CACHE_CERTS_WEBVIEW_CONTEXT
+WEBVIEW_COURSE_CONTEXT_CACHE_KEY = 'appsembler_credentials.webview_course_context.{}'
+WEBVIEW_ORGANIZATION_CONTEXT_CACHE_KEY = 'appsembler_credentials.webview_organization_context.{}'
+# token changed whenever an organization or the organizations of a course change
+ORGANIZATIONS_GENERATION_CACHE_KEY = 'appsembler_credentials.webview_organizations_generation'
+
+# mutable context values, which are copied to notice in place changes
+MUTABLE_CONTEXT_TYPES = (dict, list, set)
+
+
+def get_extension_field_names():
+    """Return the names of the fields of all course extension mixins, in order and without duplicates."""
+    field_names = []
+    for mixin in get_CourseDescriptor_mixins():
+        for field_name in mixin.fields:
+            if field_name not in field_names:
+                field_names.append(field_name)
+    return tuple(field_names)
+
+
+# the mixins are set by settings, so don't change while running
+EXTENSION_FIELD_NAMES = get_extension_field_names()
+
+
+def _get_course_version(course):
+    """Return an identifier of the course's published version, or None if it has none."""
+    return getattr(course, 'course_version', None) or getattr(course, 'subtree_edited_on', None)
+
+
+def get_extension_fields_context(course):
+    """Return a dict of the course's extension field values, cached per course and published version."""
+    version = _get_course_version(course)
+    if version is None:
+        return dict((field_name, getattr(course, field_name)) for field_name in EXTENSION_FIELD_NAMES)
+
+    cache_key = EXTENSION_FIELDS_CACHE_KEY.format(make_fingerprint(unicode(course.id), version))
+    extension_fields = cache.get(cache_key)
+    if extension_fields is None:
+        extension_fields = dict((field_name, getattr(course, field_name)) for field_name in EXTENSION_FIELD_NAMES)
+        cache.set(cache_key, extension_fields, EXTENSION_FIELDS_CACHE_TIMEOUT)
+    return extension_fields
+
+
+def _get_html_view_configuration_id():
+    """Return the id of the active CertificateHtmlViewConfiguration, from its ConfigurationModel cache."""
+    from certificates.models import CertificateHtmlViewConfiguration
+    return CertificateHtmlViewConfiguration.current().id
+
+
+def _snapshot_context(context):
+    """Return a copy of the context, with copies of its mutable values."""
+    return dict(
+        (key, copy.deepcopy(value) if isinstance(value, MUTABLE_CONTEXT_TYPES) else value)
+        for key, value in context.items()
+    )
+
+
+def _context_value_changed(before, key, value):
+    """Return True if a context value was added, replaced or, if mutable, changed in place."""
+    if key not in before:
+        return True
+    if isinstance(value, MUTABLE_CONTEXT_TYPES):
+        return before[key] != value
+    return before[key] is not value
+
+
+def _update_context_from_cache(cache_key, context, update):
+    """
+    Apply the changes update makes to the context, cached under cache_key if it isn't None.
+
+    Only the keys update adds, replaces or changes in place are cached, so per-request values
+    in the context are left alone.
+    """
+    if cache_key is None:
+        update()
+        return
+
+    changes = cache.get(cache_key)
+    if changes is None:
+        before = _snapshot_context(context)
+        update()
+        changes = dict((key, value) for key, value in context.items() if _context_value_changed(before, key, value))
+        cache.set(cache_key, changes, app_settings.CERTS_WEBVIEW_CONTEXT_CACHE_TIMEOUT)
+    else:
+        context.update(changes)
+
+
+def _get_course_context_cache_key(request, context, course, platform_name):
+    """
+    Return the cache key of the course part of the webview context, or None if it can't be cached.
+
+    The key covers the course's published version, the active HTML view configuration, the
+    request's scheme, host and language, and the context values the course part is built from.
+    """
+    if not app_settings.CACHE_CERTS_WEBVIEW_CONTEXT:
+        return None
+    version = _get_course_version(course)
+    if version is None:
+        return None
+    return WEBVIEW_COURSE_CONTEXT_CACHE_KEY.format(make_fingerprint(
+        unicode(course.id),
+        version,
+        _get_html_view_configuration_id(),
+        request.is_secure(),
+        request.get_host(),
+        get_language(),
+        platform_name,
+        context.get('certificate_data', {}).get('course_title', ''),
+        context.get('organization_long_name'),
+        context.get('organization_short_name'),
+    ))
+
+
 def _update_course_context(request, context, course, platform_name):
     """Course-related context for certificate webview, extended with Mixin fields."""
-    orig__update_course_context(request, context, course, platform_name)
+    def update():
+        orig__update_course_context(request, context, course, platform_name)
 
-    # add our course extension fields
-    course_mixins = get_CourseDescriptor_mixins()
-    for mixin in course_mixins:
-        for f in mixin.fields:
-            context[f] = getattr(course, f)
+        # add our course extension fields
+        context.update(get_extension_fields_context(course))
 
+    _update_context_from_cache(_get_course_context_cache_key(request, context, course, platform_name),
+                               context, update)
+
+
+def _get_organizations_generation():
+    """Return the token of the current state of organizations and their courses."""
+    generation = cache.get(ORGANIZATIONS_GENERATION_CACHE_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(ORGANIZATIONS_GENERATION_CACHE_KEY, generation, None):
+            generation = cache.get(ORGANIZATIONS_GENERATION_CACHE_KEY, generation)
+    return generation
+
+
+def _organizations_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Change the organizations token, so cached organization context isn't read again."""
+    cache.set(ORGANIZATIONS_GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def connect_organizations_signals():
+    """Change the organizations token whenever an organization or a course's organizations are saved or deleted."""
+    for model_name in ('Organization', 'OrganizationCourse'):
+        try:
+            model = apps.get_model('organizations', model_name)
+        except LookupError:
+            continue  # organizations app not installed
+        post_save.connect(_organizations_changed, sender=model,
+                          dispatch_uid='appsembler_webview_organizations_saved_{}'.format(model_name))
+        post_delete.connect(_organizations_changed, sender=model,
+                            dispatch_uid='appsembler_webview_organizations_deleted_{}'.format(model_name))
+
+
+def _update_organization_context(context, course):
+    """
+    Organization-related context for certificate webview, cached if enabled.
+
+    Cached per course version, which covers display_organization, the organizations token
+    and language.
+    """
+    cache_key = None
+    version = _get_course_version(course)
+    if app_settings.CACHE_CERTS_WEBVIEW_CONTEXT and version is not None:
+        cache_key = WEBVIEW_ORGANIZATION_CONTEXT_CACHE_KEY.format(make_fingerprint(
+            unicode(course.id),
+            version,
+            _get_organizations_generation(),
+            get_language(),
+        ))
+    _update_context_from_cache(cache_key, context, lambda: orig__update_organization_context(context, course))
+
+
+def _render_certificate_template(request, context, course, user_certificate):
+    """
+    Render the certificate webview, applying the course org's HTML view overrides if resolved at render.
+
+    The webview applies the course's cert_html_view_overrides last, just before rendering.  The org
+    layer is applied right after them, so like overrides copied into the course on publish, org
+    overrides take precedence over every other context value, the course's own overrides included.
+    """
+    if org_overrides.resolve_org_overrides_at_render():
+        context.update(org_overrides.get_org_html_view_overrides(course.id.org))
+    return orig__render_certificate_template(request, context, course, user_certificate)
+
+
+def patch_webview(webview):
+    """Monkeypatch the certificates webview module to extend its context."""
+    global orig__update_course_context, orig__update_organization_context  # pylint: disable=global-statement
+    global orig__render_certificate_template  # pylint: disable=global-statement
 
-if not hasattr(settings, 'STUDIO_NAME'):  # only do this in LMS
     logger.warn('Monkeypatching lms.djangoapps.certificates.views.webview._update_course_context '
                 'to extend with Appsembler Mixin fields')
-    from lms.djangoapps.certificates.views import webview
     orig__update_course_context = webview._update_course_context
     webview._update_course_context = _update_course_context
+    orig__update_organization_context = webview._update_organization_context
+    webview._update_organization_context = _update_organization_context
+    orig__render_certificate_template = webview._render_certificate_template
+    webview._render_certificate_template = _render_certificate_template
+
+
+if not hasattr(settings, 'STUDIO_NAME'):  # only do this in LMS
+    # patch the webview when something imports it, so processes which never render certificates don't import it
+    when_imported(WEBVIEW_MODULE, patch_webview)
 
 # replace certificates handler which always enables self-gen'd certs for self-paced courses
 # with ours that only enables self-gen'd certs on self-paced if we set feature flag for it
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Per-org HTML view configuration overrides, resolved when certificates are rendered.
+
+With RESOLVE_CERTS_HTML_VIEW_ORG_OVERRIDES_AT_RENDER set, org overrides from
+CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES are not copied into each course's
+cert_html_view_overrides on publish.  The certificate webview applies them instead, from
+layers precomputed per org at startup and again whenever the overrides setting is replaced.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import copy
+
+from . import app_settings
+
+
+# precomputed override layers per org, valid for the overrides setting they were built from
+_org_layers = {'overrides_setting': None, 'orgs': {}}
+
+
+def compile_org_html_view_overrides():
+    """Build the override layer of every org in CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES."""
+    overrides_setting = app_settings.CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES
+    _org_layers.update({
+        'overrides_setting': overrides_setting,
+        'orgs': dict((org, copy.deepcopy(overrides)) for org, overrides in (overrides_setting or {}).items()),
+    })
+
+
+def get_org_html_view_overrides(org):
+    """Return the HTML view configuration overrides of a course org, an empty dict if it has none."""
+    if _org_layers['overrides_setting'] is not app_settings.CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES:
+        compile_org_html_view_overrides()
+    return _org_layers['orgs'].get(org, {})
+
+
+def resolve_org_overrides_at_render():
+    """Return True if org overrides are applied by the certificate webview instead of on publish."""
+    return bool(app_settings.RESOLVE_CERTS_HTML_VIEW_ORG_OVERRIDES_AT_RENDER)
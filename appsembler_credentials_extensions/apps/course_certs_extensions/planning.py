@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Dry-run planning of which courses need per-course certificate setup.
+
+Only cheap reads are used: CourseOverview, CourseMode, CertificateGenerationCourseSetting
+and the CourseExtensionsState records of applied pre_publish steps, a chunk of courses
+at a time.  Nothing is written and no course is loaded from the modulestore.
+
+All courses are enumerated from CourseOverview, then from the modulestore's course
+summaries for any courses which have no CourseOverview yet.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+
+from course_modes.models import CourseMode
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from xmodule.modulestore.django import modulestore
+
+from appsembler_credentials_extensions.common import pre_publish
+
+from . import app_settings
+from . import signals
+from .models import CourseExtensionsState
+
+
+DEFAULT_COURSE_MODE = 'default_course_mode'
+CERT_DISPLAY_DEFAULTS = 'cert_display_defaults'
+DEFAULT_CERTIFICATE = 'default_certificate'
+SELF_GENERATED_CERTS = 'self_generated_certs'
+ISSUE_BADGES = 'issue_badges'
+
+CHECKS = (DEFAULT_COURSE_MODE, CERT_DISPLAY_DEFAULTS, DEFAULT_CERTIFICATE, SELF_GENERATED_CERTS, ISSUE_BADGES)
+
+PLAN_CHUNK_SIZE = 500
+COURSE_KEYS_CHUNK_SIZE = 1000
+
+OVERVIEW_FIELDS = ('id', 'certificates_display_behavior', 'cert_html_view_enabled',
+                   'has_any_active_web_certificate', 'self_paced')
+
+
+def _iter_course_keys_without_overview(chunk_size):
+    """Yield the keys of modulestore courses which have no CourseOverview, from their course summaries."""
+    course_keys = [summary.id.for_branch(None) for summary in modulestore().get_course_summaries()]
+    for start in range(0, len(course_keys), chunk_size):
+        keys = course_keys[start:start + chunk_size]
+        with_overview = set(CourseOverview.objects.filter(id__in=keys).values_list('id', flat=True))
+        for course_key in keys:
+            if course_key not in with_overview:
+                yield course_key
+
+
+def iter_course_keys(chunk_size=COURSE_KEYS_CHUNK_SIZE):
+    """
+    Lazily yield the keys of all courses, fetching them a chunk at a time.
+
+    Keys are paged through from CourseOverview, then courses which have no CourseOverview,
+    like courses never published since overviews were introduced, are found from the
+    modulestore's course summaries, which don't load the courses.
+    """
+    last_key = None
+    while True:
+        overviews = CourseOverview.objects.order_by('id')
+        if last_key is not None:
+            overviews = overviews.filter(id__gt=last_key)
+        chunk = list(overviews.values_list('id', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        for course_key in chunk:
+            yield course_key
+        last_key = chunk[-1]
+
+    for course_key in _iter_course_keys_without_overview(chunk_size):
+        yield course_key
+
+
+def _iter_overview_chunks(course_keys, chunk_size):
+    """Yield lists of (course key, overview values or None), a chunk of the course keys at a time."""
+    course_keys = iter(course_keys)
+    while True:
+        keys = list(islice(course_keys, chunk_size))
+        if not keys:
+            return
+        overviews = dict(
+            (overview['id'], overview)
+            for overview in CourseOverview.objects.filter(id__in=keys).values(*OVERVIEW_FIELDS)
+        )
+        yield [(course_key, overviews.get(course_key)) for course_key in keys]
+
+
+def _courses_with_default_mode(course_keys):
+    """Return the set of the course keys which have a CourseMode in the default mode."""
+    return set(CourseMode.objects.filter(
+        course_id__in=course_keys, mode_slug=CourseMode.DEFAULT_MODE_SLUG
+    ).values_list('course_id', flat=True))
+
+
+def _applied_steps(course_keys):
+    """Return a dict of course key to a dict of applied step name to fingerprint."""
+    applied = defaultdict(dict)
+    for course_key, step, fingerprint in CourseExtensionsState.objects.filter(
+            course_id__in=course_keys).values_list('course_id', 'step', 'fingerprint'):
+        applied[course_key][step] = fingerprint
+    return applied
+
+
+def _step_is_current(step, fingerprints, applied):
+    """Return True if the step is recorded as applied under its current fingerprint."""
+    return step in fingerprints and applied.get(step) == fingerprints[step]
+
+
+def _needed_checks(course_key, overview, has_default_mode, self_generation_enabled, applied, replace):
+    """Return the list of checks for which the course needs setup."""
+    if overview is None:
+        return list(CHECKS)  # no overview to check against, so assume the course needs everything
+
+    certs_enabled = settings.FEATURES.get('CERTIFICATES_HTML_VIEW', False)
+    fingerprints = pre_publish.get_fingerprints(course_key)
+    needed = []
+
+    if certs_enabled and not has_default_mode:
+        needed.append(DEFAULT_COURSE_MODE)
+
+    if certs_enabled and app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS and (
+            overview['certificates_display_behavior'] != 'early_with_info' or
+            not overview['cert_html_view_enabled'] or
+            not _step_is_current('course_certs.cert_defaults', fingerprints, applied)):
+        needed.append(CERT_DISPLAY_DEFAULTS)
+
+    if certs_enabled and (replace or (
+            not overview['has_any_active_web_certificate'] and
+            not _step_is_current('course_certs.default_certificate', fingerprints, applied))):
+        needed.append(DEFAULT_CERTIFICATE)
+
+    self_paced = overview['self_paced']
+    if certs_enabled and not (self_generation_enabled and self_paced is True) and \
+            self_generation_enabled != signals.self_generated_certs_enabled_by_pacing(self_paced):
+        needed.append(SELF_GENERATED_CERTS)
+
+    if 'badges.issue_badges' in fingerprints and \
+            not _step_is_current('badges.issue_badges', fingerprints, applied):
+        needed.append(ISSUE_BADGES)
+
+    return needed
+
+
+def plan_courses(course_keys=None, replace=False, chunk_size=PLAN_CHUNK_SIZE):
+    """
+    Yield (course key, list of needed checks) for each course needing setup.
+
+    Plans for all courses if course_keys is None; courses without a CourseOverview are
+    assumed to need every check.  If replace is True, every course needs its default
+    certificate replaced.
+    """
+    if course_keys is None:
+        course_keys = iter_course_keys(chunk_size)
+    for chunk in _iter_overview_chunks(course_keys, chunk_size):
+        keys = [course_key for course_key, _ in chunk]
+        with_default_mode = _courses_with_default_mode(keys)
+        self_generation = signals.get_self_generated_certs_settings(keys)
+        applied_steps = _applied_steps(keys)
+        for course_key, overview in chunk:
+            needed = _needed_checks(
+                course_key,
+                overview,
+                course_key in with_default_mode,
+                self_generation.get(course_key, False),
+                applied_steps.get(course_key, {}),
+                replace,
+            )
+            if needed:
+                yield course_key, needed
@@ -2,15 +2,21 @@
 
 from __future__ import absolute_import, unicode_literals
 
+from collections import namedtuple, OrderedDict
 import copy
 from functools import partial
+import hashlib
 import json
 import logging
+import os
 
 from celery.task import task
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import get_storage_class
+from django.db import transaction
 from django.dispatch.dispatcher import receiver
+from django.utils import timezone
 
 try:
     from openedx.core.djangoapps.contentserver.caching import del_cached_content
@@ -28,79 +34,201 @@ except ImportError:
 # don't import from lms.djangoapps.certificates here or it will
 # mess up app registration
 from certificates.models import CertificateGenerationCourseSetting
-from course_modes.models import CourseMode
 from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.models.course_details import COURSE_PACING_CHANGE
 from xmodule.contentstore.django import contentstore
 from xmodule.contentstore.content import StaticContent
-from xmodule.modulestore.django import SignalHandler, modulestore
+from xmodule.modulestore.django import SignalHandler
+
+from appsembler_credentials_extensions.common import pre_publish
+from appsembler_credentials_extensions.common.helpers import make_fingerprint
 
 from . import app_settings
+from . import default_course_mode
 from . import helpers
+from . import org_overrides
+
+
+# default certificate fields, apart from is_active and signatories
+DEFAULT_CERT_FIELDS = (
+    ("course_title", ""),
+    ("name", "Default"),
+    ("version", 1),
+    ("editing", False),
+    ("description", "Default certificate"),
+)
+
+# precompiled default certificate for a course org: signatories is a tuple of
+# (signatory fields as a tuple of items, theme signature image path) pairs
+DefaultCertTemplate = namedtuple('DefaultCertTemplate', ['is_active', 'signatories'])
 
 
-DEFAULT_CERT = """
-    {{"course_title": "", "name": "Default", "is_active": {},
-    "signatories": {}, "version": 1, "editing": false,
-    "description": "Default certificate"}}
-"""
+# index of signature images already stored as course assets, keyed on course, path and content digest
+SIGNATURE_ASSET_CACHE_KEY = 'appsembler_credentials.signature_asset.{}'
+SIGNATURE_ASSET_CACHE_TIMEOUT = 60 * 60 * 24
 
+# number of courses per query when reading or writing self-generated certs settings in bulk
+SELF_GENERATED_CERTS_BATCH_SIZE = 500
+
+# per-course marker of a scheduled self-generated certs toggle, and the latest pacing to toggle for;
+# they outlive the countdown so a lost task message doesn't block toggling the course for long
+SELF_GENERATED_CERTS_PENDING_CACHE_KEY = 'appsembler_credentials.self_generated_certs_toggle.pending.{}'
+SELF_GENERATED_CERTS_PACING_CACHE_KEY = 'appsembler_credentials.self_generated_certs_toggle.self_paced.{}'
+SELF_GENERATED_CERTS_TOGGLE_CACHE_TIMEOUT = 60 * 5
 
 logger = logging.getLogger(__name__)
 
+# per-process cache of theme signature image digests: path -> ((mtime, size), digest)
+_signature_img_digests = {}
+
+# compiled DefaultCertTemplates per org, valid for the settings values they were compiled from
+_default_cert_templates = {'signatories_setting': None, 'activate': None, 'orgs': {}}
+
 
 # TODO: refactor these handlers for DRY
 
 
+def _get_org_signatories(org):
+    """Return the configured default certificate signatories for a course org."""
+    signatories = app_settings.DEFAULT_CERT_SIGNATORIES
+    if not signatories:
+        return []
+    if isinstance(signatories, (list, tuple)):
+        return signatories  # some older configs are just a list of signatories
+
+    # use org-specific signatories if defined for this course's org
+    org_signatories = signatories.get('course_org_overrides', {})
+    if org in org_signatories:
+        return org_signatories[org]
+    return signatories.get('default', [])
+
+
+def _compile_default_cert_template(org):
+    """Build the course-independent part of the default certificate for a course org."""
+    compiled = []
+    for i, sig in enumerate(_get_org_signatories(org)):
+        default_cert_signatory = copy.deepcopy(sig)
+        default_cert_signatory['id'] = i
+        if default_cert_signatory.get('organization') is None:
+            default_cert_signatory.update({'organization': ''})
+        try:
+            theme_asset_path = default_cert_signatory.pop('signature_image_path')
+        except KeyError:
+            raise store_certificates.CertificateValidationError(
+                "You cannot store a signatory without a signature path")
+        compiled.append((tuple(default_cert_signatory.items()), theme_asset_path))
+    return DefaultCertTemplate(bool(app_settings.ACTIVATE_DEFAULT_CERTS), tuple(compiled))
+
+
+def _get_template_key(org):
+    """Return the org whose template a course org uses: itself if it has its own signatories, else None."""
+    signatories = app_settings.DEFAULT_CERT_SIGNATORIES
+    if isinstance(signatories, dict) and org in signatories.get('course_org_overrides', {}):
+        return org
+    return None
+
+
+def get_default_cert_template(org):
+    """
+    Return the compiled default certificate template for a course org.
+
+    Templates are compiled once per org with its own signatories, and once for all
+    other orgs, and compiled again if the signatories or activation settings are replaced.
+    """
+    templates = _default_cert_templates
+    if (templates['signatories_setting'] is not app_settings.DEFAULT_CERT_SIGNATORIES or
+            templates['activate'] != app_settings.ACTIVATE_DEFAULT_CERTS):
+        templates.update({
+            'signatories_setting': app_settings.DEFAULT_CERT_SIGNATORIES,
+            'activate': app_settings.ACTIVATE_DEFAULT_CERTS,
+            'orgs': {},
+        })
+    template_key = _get_template_key(org)
+    try:
+        return templates['orgs'][template_key]
+    except KeyError:
+        template = templates['orgs'][template_key] = _compile_default_cert_template(template_key)
+        return template
+
+
+def compile_default_cert_templates():
+    """Compile default certificate templates for the default and every org-specific signatories config."""
+    signatories = app_settings.DEFAULT_CERT_SIGNATORIES or {}
+    orgs = signatories.get('course_org_overrides', {}).keys() if isinstance(signatories, dict) else []
+    for org in [None] + list(orgs):
+        try:
+            get_default_cert_template(org)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Could not compile default certificate template for org {}'.format(org))
+
+
+def make_default_cert_data(course_key):
+    """
+    Return the default certificate data for a course, with its signatories'
+    signature images stored as course assets.
+    """
+    template = get_default_cert_template(course_key.org)
+    signatories = []
+    for signatory_fields, theme_asset_path in template.signatories:
+        signatory = dict(signatory_fields)
+        signatory['signature_image_path'] = store_theme_signature_img_as_asset(course_key, theme_asset_path)
+        signatories.append(signatory)
+
+    cert_data = dict(DEFAULT_CERT_FIELDS)
+    cert_data.update({'is_active': template.is_active, 'signatories': signatories})
+    return cert_data
+
+
 def make_default_cert(course_key):
     """
     Add any signatories to default cert string and return the string
     """
+    return json.dumps(make_default_cert_data(course_key))
 
-    default_cert = DEFAULT_CERT
 
-    if app_settings.DEFAULT_CERT_SIGNATORIES:
-        signatories = app_settings.DEFAULT_CERT_SIGNATORIES
+def make_default_certificate(course):
+    """
+    Return a new default Certificate for the course.
 
-        # use org-specific signatories if defined for this course's org
-        if 'course_org_overrides' in signatories:
-            try:
-                signatories = signatories['course_org_overrides'][course_key.org]
-            except KeyError:
-                pass
-        else:
-            try:
-                signatories = signatories['default']
-            except KeyError:
-                pass  # some older configs won't have that key
-
-        updated = []
-        for i, sig in enumerate(signatories):
-            default_cert_signatory = copy.deepcopy(sig)
-            default_cert_signatory['id'] = i
-            if default_cert_signatory.get('organization') is None:
-                default_cert_signatory.update({'organization': ''})
-            try:
-                theme_asset_path = sig['signature_image_path']
-                sig_img_path = store_theme_signature_img_as_asset(course_key, theme_asset_path)
-                default_cert_signatory['signature_image_path'] = sig_img_path
-            except KeyError:
-                raise store_certificates.CertificateValidationError(
-                    "You cannot store a signatory without a signature path")
-            updated.append(default_cert_signatory)
-        default_cert_signatories = json.dumps(updated)
-        return default_cert.format(str(app_settings.ACTIVATE_DEFAULT_CERTS).lower(), default_cert_signatories)
+    Does what CertificateManager.deserialize_certificate does, without serializing
+    the certificate data to JSON and parsing it back.
+    """
+    certificate_data = make_default_cert_data(course.id)
+    store_certificates.CertificateManager.validate(certificate_data)
+    certificate_data = store_certificates.CertificateManager.assign_id(course, certificate_data)
+    return store_certificates.Certificate(course, certificate_data)
+
+
+def _get_signature_img_digest(path):
+    """
+    Return the MD5 digest of a signature image file, as the contentstore records it for assets.
+
+    Files are only read again if their size or modification time changed since the
+    last read in this process.  Only the digest is kept, not the image.
+    """
+    stat = os.stat(path)
+    file_id = (stat.st_mtime, stat.st_size)
+    cached = _signature_img_digests.get(path)
+    if cached is None or cached[0] != file_id:
+        with open(path, 'rb') as imgfile:
+            cached = (file_id, hashlib.md5(imgfile.read()).hexdigest())
+        _signature_img_digests[path] = cached
+    return cached[1]
 
-    else:
-        return default_cert.format(str(app_settings.ACTIVATE_DEFAULT_CERTS).lower(), "[]")
+
+def _signature_asset_cache_key(course_key, theme_asset_path, digest):
+    """Cache key for the course asset path of a signature image with the given content digest."""
+    key = '{}|{}|{}'.format(course_key, theme_asset_path, digest)
+    return SIGNATURE_ASSET_CACHE_KEY.format(hashlib.sha1(key.encode('utf-8')).hexdigest())
 
 
 def store_theme_signature_img_as_asset(course_key, theme_asset_path):
     """
     to be able to edit or delete signatories and Certificates properly
     we must store signature PNG file as course content asset.
-    Store file from theme as asset.
+    Store file from theme as asset, unless identical content was already stored
+    for this course.
     Return static asset URL path
     """
 
@@ -108,11 +236,24 @@ def store_theme_signature_img_as_asset(course_key, theme_asset_path):
     static_storage = get_storage_class(settings.STATICFILES_STORAGE)()
     path = static_storage.path(theme_asset_path)
 
+    digest = _get_signature_img_digest(path)
+    cache_key = _signature_asset_cache_key(course_key, theme_asset_path, digest)
+    asset_path = cache.get(cache_key)
     content_loc = StaticContent.compute_location(course_key, theme_asset_path)
+    if asset_path is not None:
+        # the asset may have been deleted or replaced in Studio, or the course re-created, since it was cached;
+        # read only its metadata, not the image
+        stored = contentstore().find(content_loc, throw_on_not_found=False, as_stream=True)
+        if stored is not None:
+            stored.close()
+            if getattr(stored, 'content_digest', None) in (None, digest):
+                return asset_path
+
+    with open(path, 'rb') as imgfile:
+        data = imgfile.read()
     # TODO: exception if not png
     sc_partial = partial(StaticContent, content_loc, filename, 'image/png')
-    with open(path, 'rb') as imgfile:
-        content = sc_partial(imgfile.read())
+    content = sc_partial(data)
 
     # then commit the content
     contentstore().save(content)
@@ -120,7 +261,9 @@ def store_theme_signature_img_as_asset(course_key, theme_asset_path):
 
     # return a path to the asset.  new style courses will need extra /
     path_extra = "/" if course_key.to_deprecated_string().startswith("course") else ""
-    return "{}{}".format(path_extra, content.location.to_deprecated_string())
+    asset_path = "{}{}".format(path_extra, content.location.to_deprecated_string())
+    cache.set(cache_key, asset_path, SIGNATURE_ASSET_CACHE_TIMEOUT)
+    return asset_path
 
 
 @receiver(SignalHandler.pre_publish)
@@ -131,45 +274,46 @@ def _default_mode_on_course_pre_publish(sender, course_key, **kwargs):  # pylint
     Create a CourseMode in the default mode.  Otherwise a CourseMode has to be added
     manually in Django admin to be able to create course certificates
     """
-    CourseMode.objects.get_or_create(
-        course_id=course_key,
-        mode_slug=CourseMode.DEFAULT_MODE_SLUG,
-        mode_display_name=CourseMode.DEFAULT_MODE.name,
-        min_price=CourseMode.DEFAULT_MODE.min_price,
-        currency=CourseMode.DEFAULT_MODE.currency
-    )
+    default_course_mode.ensure_default_mode(course_key)
 
 
-@receiver(SignalHandler.pre_publish)
 @helpers.disable_if_certs_feature_off
-def _change_cert_defaults_on_pre_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+def change_cert_defaults(course, **kwargs):  # pylint: disable=unused-argument
     """
-    Catches the signal that a course has been pre-published in Studio and
-    updates certificate_display_behavior and ...
+    Pre-publish step which updates certificate_display_behavior and other
+    cert-related advanced settings on the course to defaults for open-ended courses.
     """
     # has to be done this way since it's not possible to monkeypatch the default attrs on the
     # CourseFields fields
     if not app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS:
-        return
-
-    store = modulestore()
-    course = store.get_course(course_key)
-    # TODO try not to keep handling this signal beyond one time, and without
-    # having to add a field to CourseDescriptor
+        return False
+
+    # the pipeline records this step as applied per course and config fingerprint,
+    # so publishes after the first one skip it until the config changes
+
+    # update certificate_html_view_overrides with any org-specific values,
+    # unless the certificate webview applies them
+    html_view_overrides = dict(course.cert_html_view_overrides)
+    if not org_overrides.resolve_org_overrides_at_render():
+        html_view_overrides.update(org_overrides.get_org_html_view_overrides(course.id.org))
+
+    return pre_publish.set_fields(
+        course,
+        certificates_display_behavior='early_with_info',
+        certificates_show_before_end=True,  # deprecated anyhow
+        cert_html_view_enabled=True,
+        cert_html_view_overrides=html_view_overrides,
+    )
 
-    course.certificates_display_behavior = 'early_with_info'
-    course.certificates_show_before_end = True  # deprecated anyhow
-    course.cert_html_view_enabled = True
 
-    # update certificate_html_view_overrides with any org-specific values
-    org_overrides = app_settings.CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES.get(course_key.org, {})
-    course.cert_html_view_overrides.update(org_overrides)
+@helpers.disable_if_certs_feature_off
+def _change_cert_defaults_on_pre_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update certificate_display_behavior and ... on a single course.
 
-    course.save()
-    try:
-        store.update_item(course, course._edited_by)
-    except AttributeError:
-        store.update_item(course, 0)
+    On publish this runs as a step of the common pre_publish pipeline instead.
+    """
+    pre_publish.run_steps(course_key, [change_cert_defaults])
 
 
 @receiver(SignalHandler.course_published)
@@ -177,9 +321,26 @@ def _change_cert_defaults_on_pre_publish(sender, course_key, **kwargs):  # pylin
 def enable_self_generated_certs(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     """
     Enable/disable the self-generated certificates according to course-pacing.
+
+    The pacing is resolved by the toggle task, so publishing doesn't wait on loading the course overview.
+    """
+    schedule_self_generated_certs_toggle(course_key, None)
+
+
+@helpers.disable_if_certs_feature_off
+def enable_self_generated_certs_for_courses(course_keys):
+    """
+    Enable/disable the self-generated certificates of many courses according to course-pacing.
+
+    Reads the pacing of all the courses in one query and sends them to one batched task.
+    Courses without a CourseOverview are sent without a pacing, for the task to build
+    their overview.
     """
-    course = CourseOverview.get_from_id(course_key)
-    toggle_self_generated_certs.delay(unicode(course_key), course.self_paced)
+    course_keys = [CourseKey.from_string(unicode(course_key)) for course_key in course_keys]
+    pacings = dict(CourseOverview.objects.filter(id__in=course_keys).values_list('id', 'self_paced'))
+    course_pacings = [(unicode(course_key), pacings.get(course_key)) for course_key in course_keys]
+    if course_pacings:
+        toggle_self_generated_certs_batch.delay(course_pacings)
 
 
 # TODO: this isn't a monkeypatch but an additional signal handler
@@ -193,7 +354,40 @@ def _listen_for_course_pacing_changed(sender, course_key, course_self_paced, **k
 
     Enable/disable the self-generated certificates according to course-pacing.
     """
-    toggle_self_generated_certs.delay(unicode(course_key), course_self_paced)
+    schedule_self_generated_certs_toggle(course_key, course_self_paced)
+
+
+def schedule_self_generated_certs_toggle(course_key, course_self_paced):
+    """
+    Toggle self-generated certificates for a course after a short countdown.
+
+    Repeated calls for a course within the countdown only update the pacing to toggle for,
+    so the toggle task runs once, with the latest pacing.  If course_self_paced is None,
+    the latest known pacing is kept, or the task reads it from the course overview.
+    """
+    course_key = unicode(course_key)
+    timeout = app_settings.SELF_GENERATED_CERTS_TOGGLE_COUNTDOWN + SELF_GENERATED_CERTS_TOGGLE_CACHE_TIMEOUT
+    if course_self_paced is not None:
+        cache.set(SELF_GENERATED_CERTS_PACING_CACHE_KEY.format(course_key), course_self_paced, timeout)
+    if cache.add(SELF_GENERATED_CERTS_PENDING_CACHE_KEY.format(course_key), True, timeout):
+        toggle_pending_self_generated_certs.apply_async(
+            (course_key,), countdown=app_settings.SELF_GENERATED_CERTS_TOGGLE_COUNTDOWN, ignore_result=True
+        )
+
+
+@task(ignore_result=True)
+def toggle_pending_self_generated_certs(course_key):
+    """
+    Toggle self-generated certificates for a course scheduled by schedule_self_generated_certs_toggle.
+
+    Uses the latest pacing scheduled for, or the course overview's if none is cached.
+    """
+    # clear the marker first, so a pacing scheduled from now on schedules another toggle
+    cache.delete(SELF_GENERATED_CERTS_PENDING_CACHE_KEY.format(course_key))
+    course_self_paced = cache.get(SELF_GENERATED_CERTS_PACING_CACHE_KEY.format(course_key))
+    if course_self_paced is None:
+        course_self_paced = CourseOverview.get_from_id(CourseKey.from_string(course_key)).self_paced
+    set_self_generated_certs([(course_key, course_self_paced)])
 
 
 @task
@@ -205,56 +399,166 @@ def toggle_self_generated_certs(course_key, course_self_paced):
     course is a self-paced course and self-generated certs on self-paced not explicitly disabled
     course is not self-paced and self-generated certs are explicitly enabled
     """
-    course_key = unicode(course_key)
-    course_key = CourseKey.from_string(course_key)
-    if CertificateGenerationCourseSetting.is_enabled_for_course(course_key) and course_self_paced is True:
-        # Catch possible edge case which may happen during upgrades:
-        # Never change an enabled active config for a self-paced course to disabled
-        logger.warn("""
-            toggle_self_generated_certs won't override an enabled CertificateGenerationCourseSetting
-            with a disabled one on a course being changed (or probably re-saved) as self-paced.
-            """)
-        return
-    enable = False if app_settings.DISABLE_SELF_GENERATED_CERTS_FOR_SELF_PACED is True else \
-        (course_self_paced or app_settings.ALWAYS_ENABLE_SELF_GENERATED_CERTS)
+    set_self_generated_certs([(course_key, course_self_paced)])
 
-    CertificateGenerationCourseSetting.set_enabled_for_course(course_key, enable)
+
+@task(ignore_result=True)
+def toggle_self_generated_certs_batch(course_pacings):
+    """
+    Enable or disable self-generated certificates for many courses according to pacing.
+
+    Takes a list of (course key, course self_paced) pairs and applies the same rules
+    as toggle_self_generated_certs to each, with bulk reads and writes.  A pacing of None
+    is read from the course overview, which is built if the course has none yet; courses
+    not found are skipped.
+    """
+    resolved_pacings = []
+    for course_key, course_self_paced in course_pacings:
+        if course_self_paced is None:
+            try:
+                course_self_paced = CourseOverview.get_from_id(CourseKey.from_string(course_key)).self_paced
+            except CourseOverview.DoesNotExist:
+                logger.warn('Course {} not found; not toggling self-generated certs'.format(course_key))
+                continue
+        resolved_pacings.append((course_key, course_self_paced))
+    set_self_generated_certs(resolved_pacings)
+
+
+def get_self_generated_certs_settings(course_keys):
+    """Return a dict of course key to whether self-generated certs are enabled, from the latest setting."""
+    enabled_field = self_generation_enabled_field()
+    course_keys = list(course_keys)
+    latest = {}
+    for start in range(0, len(course_keys), SELF_GENERATED_CERTS_BATCH_SIZE):
+        for course_key, enabled in CertificateGenerationCourseSetting.objects.filter(
+                course_key__in=course_keys[start:start + SELF_GENERATED_CERTS_BATCH_SIZE]
+        ).order_by('created', 'id').values_list('course_key', enabled_field):
+            latest[course_key] = enabled
+    return latest
+
+
+def set_self_generated_certs(course_pacings):
+    """
+    Enable or disable self-generated certificates for (course key, course self_paced) pairs.
+
+    Existing settings are read in bulk and only changed ones are written.  Returns the
+    number of courses whose setting was written.
+    """
+    desired = OrderedDict()
+    for course_key, course_self_paced in course_pacings:
+        desired[CourseKey.from_string(unicode(course_key))] = course_self_paced  # the latest pair for a course wins
+    current = get_self_generated_certs_settings(desired.keys())
+
+    enabled_field = self_generation_enabled_field()
+    new_settings = []
+    updates = {True: [], False: []}
+    for course_key, course_self_paced in desired.items():
+        enabled = current.get(course_key)
+        if enabled and course_self_paced is True:
+            # Catch possible edge case which may happen during upgrades:
+            # Never change an enabled active config for a self-paced course to disabled
+            logger.warn("""
+                toggle_self_generated_certs won't override an enabled CertificateGenerationCourseSetting
+                with a disabled one on a course being changed (or probably re-saved) as self-paced.
+                """)
+            continue
+        enable = self_generated_certs_enabled_by_pacing(course_self_paced)
+        if enabled is not None and bool(enabled) == enable:
+            continue
+        if enabled is not None and enabled_field != 'enabled':
+            updates[enable].append(course_key)
+        else:
+            # settings with an 'enabled' field keep their history, the latest one being current
+            new_settings.append(CertificateGenerationCourseSetting(course_key=course_key, **{enabled_field: enable}))
+
+    with transaction.atomic():
+        CertificateGenerationCourseSetting.objects.bulk_create(new_settings,
+                                                               batch_size=SELF_GENERATED_CERTS_BATCH_SIZE)
+        for enable, course_keys in updates.items():
+            for start in range(0, len(course_keys), SELF_GENERATED_CERTS_BATCH_SIZE):
+                CertificateGenerationCourseSetting.objects.filter(
+                    course_key__in=course_keys[start:start + SELF_GENERATED_CERTS_BATCH_SIZE]
+                ).update(modified=timezone.now(), **{enabled_field: enable})
+    return len(new_settings) + len(updates[True]) + len(updates[False])
+
+
+def self_generated_certs_enabled_by_pacing(course_self_paced):
+    """Return whether self-generated certificates should be enabled for a course with this pacing."""
+    return False if app_settings.DISABLE_SELF_GENERATED_CERTS_FOR_SELF_PACED is True else \
+        bool(course_self_paced or app_settings.ALWAYS_ENABLE_SELF_GENERATED_CERTS)
+
+
+def self_generation_enabled_field():
+    """Name of the CertificateGenerationCourseSetting field storing whether self-generation is enabled."""
+    field_names = [field.name for field in CertificateGenerationCourseSetting._meta.get_fields()]
+    return 'self_generation_enabled' if 'self_generation_enabled' in field_names else 'enabled'
 
 
-@receiver(SignalHandler.pre_publish)
 @helpers.disable_if_certs_feature_off
 @helpers.cms_only
-def _make_default_active_certificate(sender, course_key, replace=False, force=False, **kwargs):
+def make_default_active_certificate(course, replace=False, force=False, **kwargs):  # pylint: disable=unused-argument
     """
-    Create an active default certificate on the course.  If we pass replace=True, it will
-    overwrite existing active certs.  If we pass force=True (the management command always
-    does), then it won't care if we are using open ended cert defaults.  We do the latter
-    since a customer might wish not to enable student-generated certs but still have a
-    default certificate ready, for example, if they want instructors to generate the HTML
-    certs.
+    Pre-publish step which creates an active default certificate on the course.
+    If we pass replace=True, it will overwrite existing active certs.  If we pass
+    force=True (the management command always does), then it won't care if we are
+    using open ended cert defaults.  We do the latter since a customer might wish
+    not to enable student-generated certs but still have a default certificate ready,
+    for example, if they want instructors to generate the HTML certs.
     """
     if not app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS and not force:
-        return
-
-    store = modulestore()
-    course = store.get_course(course_key)
+        return False
 
     # only create a new one if there are no existing, even deactivated certificates
     if len(course.certificates.get('certificates', {})) and not replace:
-        return
+        return False
 
-    default_cert_data = make_default_cert(course_key)
-    new_cert = store_certificates.CertificateManager.deserialize_certificate(course, default_cert_data)
+    new_cert = make_default_certificate(course)
     if 'certificates' not in course.certificates.keys():
         course.certificates['certificates'] = []
     if replace:
         course.certificates['certificates'] = [new_cert.certificate_data, ]
     else:
         course.certificates['certificates'].append(new_cert.certificate_data)
-    # TODO replace this logic w/o using the custom mixin fields
-    # course.active_default_cert_created = True
-    course.save()
-    try:
-        store.update_item(course, course._edited_by)
-    except AttributeError:
-        store.update_item(course, 0)
+    return True
+
+
+@helpers.disable_if_certs_feature_off
+@helpers.cms_only
+def _make_default_active_certificate(sender, course_key, replace=False, force=False, **kwargs):
+    """
+    Create an active default certificate on a single course.
+
+    On publish this runs as a step of the common pre_publish pipeline instead.
+    """
+    pre_publish.run_steps(course_key, [make_default_active_certificate], replace=replace, force=force)
+
+
+def _cert_defaults_fingerprint(course_key):
+    """Digest of the configuration change_cert_defaults applies to a course."""
+    if org_overrides.resolve_org_overrides_at_render():
+        copied_org_overrides = None  # applied by the certificate webview, not copied into the course
+    else:
+        copied_org_overrides = org_overrides.get_org_html_view_overrides(course_key.org)
+    return make_fingerprint(
+        settings.FEATURES.get('CERTIFICATES_HTML_VIEW', False),
+        app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS,
+        org_overrides.resolve_org_overrides_at_render(),
+        copied_org_overrides,
+    )
+
+
+def _default_certificate_fingerprint(course_key):  # pylint: disable=unused-argument
+    """Digest of the configuration make_default_active_certificate applies to a course."""
+    return make_fingerprint(
+        settings.FEATURES.get('CERTIFICATES_HTML_VIEW', False),
+        app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS,
+        app_settings.ACTIVATE_DEFAULT_CERTS,
+        app_settings.DEFAULT_CERT_SIGNATORIES,
+    )
+
+
+# course-loading pre_publish handlers run as steps of the one pre_publish pipeline receiver
+pre_publish.register_step('course_certs.cert_defaults', change_cert_defaults,
+                          fingerprint=_cert_defaults_fingerprint)
+pre_publish.register_step('course_certs.default_certificate', make_default_active_certificate,
+                          fingerprint=_default_certificate_fingerprint)
@@ -0,0 +1,108 @@
+"""Tests for the create_course_certificates management command."""
+
+from __future__ import absolute_import, unicode_literals
+
+from StringIO import StringIO
+
+import mock
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+
+from ..management.commands import create_course_certificates
+from ..models import CourseSetupJournalEntry
+
+
+COMMAND_MODULE = 'appsembler_credentials_extensions.apps.course_certs_extensions.management.commands.' \
+                 'create_course_certificates'
+
+
+class CreateCourseCertificatesTestCase(TestCase):
+    """ Tests for setting up courses with the create_course_certificates command."""
+
+    @mock.patch(COMMAND_MODULE + '.setup_course')
+    def test_summary(self, mock_setup_course):
+        """ Verify each course is set up and a summary is written."""
+        mock_setup_course.side_effect = lambda key, replace: (key, None)
+        out = StringIO()
+        call_command('create_course_certificates', 'course-v1:org+one+run', 'course-v1:org+two+run', stdout=out)
+        self.assertEqual(mock_setup_course.call_count, 2)
+        self.assertIn('Set up 2 course(s), 0 failed, 0 skipped as already done.', out.getvalue())
+
+    @mock.patch(COMMAND_MODULE + '.signals.enable_self_generated_certs_for_courses')
+    @mock.patch(COMMAND_MODULE + '.setup_course')
+    def test_self_generated_certs_toggled_in_batches(self, mock_setup_course, mock_enable):
+        """ Verify self-generated certs are toggled in batches, for set up courses only."""
+        mock_setup_course.side_effect = [('course-v1:org+one+run', None),
+                                         ('course-v1:org+two+run', 'ValueError: boom'),
+                                         ('course-v1:org+three+run', None)]
+        with mock.patch(COMMAND_MODULE + '.SELF_GENERATED_CERTS_CHUNK_SIZE', 1), self.assertRaises(CommandError):
+            call_command('create_course_certificates', 'course-v1:org+one+run', 'course-v1:org+two+run',
+                         'course-v1:org+three+run', stdout=StringIO())
+        self.assertEqual(mock_enable.call_args_list, [mock.call(['course-v1:org+one+run']),
+                                                      mock.call(['course-v1:org+three+run'])])
+
+    @mock.patch(COMMAND_MODULE + '.setup_course')
+    def test_failures_are_reported(self, mock_setup_course):
+        """ Verify a failing course doesn't stop the run, and is reported at the end."""
+        mock_setup_course.side_effect = [('course-v1:org+one+run', 'ValueError: boom'),
+                                         ('course-v1:org+two+run', None)]
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('create_course_certificates', 'course-v1:org+one+run', 'course-v1:org+two+run', stdout=out)
+        self.assertIn('Set up 1 course(s), 1 failed, 0 skipped as already done.', out.getvalue())
+        self.assertIn('course-v1:org+one+run: ValueError: boom', out.getvalue())
+
+    @mock.patch(COMMAND_MODULE + '.setup_course')
+    def test_resume_journaled_run(self, mock_setup_course):
+        """ Verify a journaled run records progress and a resumed run skips completed courses."""
+        mock_setup_course.side_effect = [('course-v1:org+one+run', None),
+                                         ('course-v1:org+two+run', 'ValueError: boom')]
+        with self.assertRaises(CommandError):
+            call_command('create_course_certificates', 'course-v1:org+one+run', 'course-v1:org+two+run',
+                         journal='test-run', stdout=StringIO())
+        self.assertEqual(CourseSetupJournalEntry.get_completed_courses('test-run'), {'course-v1:org+one+run'})
+
+        mock_setup_course.reset_mock()
+        mock_setup_course.side_effect = [('course-v1:org+two+run', None)]
+        out = StringIO()
+        call_command('create_course_certificates', 'course-v1:org+one+run', 'course-v1:org+two+run',
+                     journal='test-run', resume=True, stdout=out)
+        mock_setup_course.assert_called_once_with('course-v1:org+two+run', False)
+        self.assertIn('Set up 1 course(s), 0 failed, 1 skipped as already done.', out.getvalue())
+        self.assertEqual(CourseSetupJournalEntry.get_completed_courses('test-run'),
+                         {'course-v1:org+one+run', 'course-v1:org+two+run'})
+
+    @mock.patch(COMMAND_MODULE + '.setup_course')
+    def test_max_inflight_writes_applies_to_single_worker(self, mock_setup_course):
+        """ Verify --max-inflight-writes limits writes without --workers too."""
+        mock_setup_course.side_effect = lambda key, replace: (key, None)
+        with mock.patch(COMMAND_MODULE + '._write_throttle'):
+            call_command('create_course_certificates', 'course-v1:org+one+run', max_inflight_writes=1,
+                         stdout=StringIO())
+            write_throttle = create_course_certificates._write_throttle  # pylint: disable=protected-access
+            self.assertIsNotNone(write_throttle.semaphore)
+
+    def test_resume_requires_journal(self):
+        """ Verify --resume can't be used without naming the run to resume."""
+        with self.assertRaises(CommandError):
+            call_command('create_course_certificates', 'course-v1:org+one+run', resume=True)
+
+    @mock.patch(COMMAND_MODULE + '.modulestore')
+    @mock.patch(COMMAND_MODULE + '.pre_publish.run_all_steps', side_effect=ValueError('boom'))
+    def test_setup_course_returns_error(self, mock_run_all_steps, mock_modulestore):  # pylint: disable=unused-argument
+        """ Verify errors setting up a course are returned rather than raised."""
+        mock_modulestore.return_value.has_course.return_value = True
+        self.assertEqual(create_course_certificates.setup_course('course-v1:org+one+run', False),
+                         ('course-v1:org+one+run', 'ValueError: boom'))
+
+    @mock.patch(COMMAND_MODULE + '.modulestore')
+    @mock.patch(COMMAND_MODULE + '.pre_publish.run_all_steps')
+    @mock.patch(COMMAND_MODULE + '.signals._default_mode_on_course_pre_publish')
+    def test_setup_course_missing_from_modulestore(self, mock_default_mode, mock_run_all_steps, mock_modulestore):
+        """ Verify nothing is written for a course missing from the modulestore, and it is reported as failed."""
+        mock_modulestore.return_value.has_course.return_value = False
+        self.assertEqual(create_course_certificates.setup_course('course-v1:org+one+run', False),
+                         ('course-v1:org+one+run', create_course_certificates.COURSE_NOT_FOUND_ERROR))
+        mock_default_mode.assert_not_called()
+        mock_run_all_steps.assert_not_called()
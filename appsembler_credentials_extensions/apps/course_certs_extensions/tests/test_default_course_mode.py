@@ -0,0 +1,96 @@
+"""Tests for the cached check of a course's default CourseMode."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from course_modes.models import CourseMode
+from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
+
+from .. import default_course_mode
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DefaultCourseModeTestCase(TestCase):
+    """ Tests for ensuring courses have the default CourseMode without a query per publish."""
+
+    def setUp(self):
+        super(DefaultCourseModeTestCase, self).setUp()
+        self.course_key = CourseKey.from_string('course-v1:org+course+run')
+        patcher = mock.patch.object(default_course_mode, '_courses_with_default_mode',
+                                    default_course_mode.OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_known_default_mode_makes_no_query(self):
+        """ Verify the default mode is created once, then known without querying."""
+        default_course_mode.ensure_default_mode(self.course_key)
+        self.assertTrue(CourseMode.objects.filter(course_id=self.course_key,
+                                                  mode_slug=CourseMode.DEFAULT_MODE_SLUG).exists())
+        with self.assertNumQueries(0):
+            default_course_mode.ensure_default_mode(self.course_key)
+
+    def test_course_mode_change_forgets_course(self):
+        """ Verify deleting a course's CourseMode makes the default mode get created again."""
+        default_course_mode.ensure_default_mode(self.course_key)
+        CourseMode.objects.filter(course_id=self.course_key).delete()  # queryset delete sends post_delete per mode
+        self.assertFalse(default_course_mode.is_known_to_have_default_mode(self.course_key))
+        default_course_mode.ensure_default_mode(self.course_key)
+        self.assertEqual(CourseMode.objects.filter(course_id=self.course_key).count(), 1)
+
+    def test_lru_evicts_least_recently_used(self):
+        """ Verify the per-process LRU keeps at most its size in courses."""
+        with mock.patch.object(default_course_mode, 'DEFAULT_MODE_LRU_SIZE', 1):
+            default_course_mode.remember_default_mode('course-v1:org+one+run')
+            default_course_mode.remember_default_mode('course-v1:org+two+run')
+        self.assertEqual(default_course_mode._courses_with_default_mode.keys(), ['course-v1:org+two+run'])
+
+    def test_provision_default_modes(self):
+        """ Verify only courses missing the default mode get it, in chunked inserts."""
+        missing = [CourseOverviewFactory.create().id for __ in range(3)]
+        with_mode = CourseOverviewFactory.create().id
+        CourseMode.objects.create(course_id=with_mode, mode_slug=CourseMode.DEFAULT_MODE_SLUG)
+
+        self.assertEqual(sorted(default_course_mode.get_courses_missing_default_mode(), key=unicode),
+                         sorted(missing, key=unicode))
+        self.assertEqual(default_course_mode.provision_default_modes(chunk_size=2), 3)
+        self.assertEqual(default_course_mode.get_courses_missing_default_mode(), [])
+        self.assertEqual(CourseMode.objects.filter(course_id=with_mode).count(), 1)
+
+    def test_change_audit_course_modes(self):
+        """ Verify audit course modes are switched to the given mode a chunk at a time."""
+        for course in ('one', 'two', 'three'):
+            CourseMode.objects.create(course_id=CourseKey.from_string('course-v1:org+{}+run'.format(course)),
+                                      mode_slug='audit')
+        CourseMode.objects.create(course_id=self.course_key, mode_slug='verified')
+        progress = mock.Mock()
+
+        self.assertEqual(default_course_mode.change_audit_course_modes(CourseMode, 'honor', 'Honor', chunk_size=2,
+                                                                       progress=progress), 3)
+        self.assertEqual(progress.call_args_list, [mock.call(2), mock.call(3)])
+        self.assertFalse(CourseMode.objects.filter(mode_slug='audit').exists())
+        self.assertEqual(CourseMode.objects.filter(mode_slug='honor', mode_display_name='Honor').count(), 3)
+        self.assertTrue(CourseMode.objects.filter(course_id=self.course_key, mode_slug='verified').exists())
+
+    def test_change_audit_course_modes_to_audit(self):
+        """ Verify switching to the stock default audit mode ends without touching any course mode."""
+        CourseMode.objects.create(course_id=self.course_key, mode_slug='audit')
+        self.assertEqual(default_course_mode.change_audit_course_modes(CourseMode, 'audit', 'Audit', chunk_size=1), 0)
+        self.assertEqual(CourseMode.objects.get(course_id=self.course_key).mode_display_name, '')
+
+    def test_change_audit_course_modes_skips_courses_with_mode(self):
+        """ Verify audit modes of courses which already have the given mode are left alone."""
+        other_course_key = CourseKey.from_string('course-v1:org+other+run')
+        CourseMode.objects.create(course_id=self.course_key, mode_slug='audit')
+        CourseMode.objects.create(course_id=self.course_key, mode_slug='honor')
+        CourseMode.objects.create(course_id=other_course_key, mode_slug='audit')
+        self.assertEqual(default_course_mode.change_audit_course_modes(CourseMode, 'honor', 'Honor'), 1)
+        self.assertTrue(CourseMode.objects.filter(course_id=self.course_key, mode_slug='audit').exists())
+        self.assertTrue(CourseMode.objects.filter(course_id=other_course_key, mode_slug='honor').exists())
@@ -0,0 +1,27 @@
+"""Tests for applying a configuration for the HTML view of course certificates."""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+from django.test import TestCase
+
+from certificates.models import CertificateHtmlViewConfiguration
+
+from .. import html_view_config
+
+
+class ApplyHtmlViewConfigurationTestCase(TestCase):
+    """ Tests for disabling old HTML View Configurations in bulk and enabling a new one."""
+
+    def test_apply_html_view_configuration(self):
+        """ Verify old configurations are disabled, and the same configuration isn't applied twice."""
+        CertificateHtmlViewConfiguration.objects.create(configuration=json.dumps({'default': {}}), enabled=True)
+        config = {'default': {'platform_name': 'Test'}}
+
+        self.assertTrue(html_view_config.apply_html_view_configuration(CertificateHtmlViewConfiguration, config))
+        enabled = CertificateHtmlViewConfiguration.objects.filter(enabled=True)
+        self.assertEqual([json.loads(conf.configuration) for conf in enabled], [config])
+
+        self.assertFalse(html_view_config.apply_html_view_configuration(CertificateHtmlViewConfiguration, config))
+        self.assertEqual(CertificateHtmlViewConfiguration.objects.count(), 2)
@@ -0,0 +1,37 @@
+"""Tests for course_certs_extensions models."""
+
+from __future__ import absolute_import, unicode_literals
+
+from django.test import TestCase
+
+from opaque_keys.edx.keys import CourseKey
+
+from ..models import CourseExtensionsState
+
+
+class CourseExtensionsStateTestCase(TestCase):
+    """ Tests for recording pre_publish steps applied to courses."""
+
+    def setUp(self):
+        super(CourseExtensionsStateTestCase, self).setUp()
+        self.course_key = CourseKey.from_string('course-v1:org+course+run')
+        self.other_course_key = CourseKey.from_string('course-v1:org+other+run')
+
+    def test_mark_and_get_applied_steps(self):
+        """ Verify applied steps are recorded and updated per course."""
+        self.assertEqual(CourseExtensionsState.get_applied_steps(self.course_key), {})
+        CourseExtensionsState.mark_applied(self.course_key, {'step_one': 'abc', 'step_two': 'def'})
+        CourseExtensionsState.mark_applied(self.course_key, {'step_one': 'xyz'})
+        self.assertEqual(CourseExtensionsState.get_applied_steps(self.course_key),
+                         {'step_one': 'xyz', 'step_two': 'def'})
+        self.assertEqual(CourseExtensionsState.get_applied_steps(self.other_course_key), {})
+
+    def test_clear(self):
+        """ Verify recorded state can be cleared for some or all courses."""
+        CourseExtensionsState.mark_applied(self.course_key, {'step_one': 'abc'})
+        CourseExtensionsState.mark_applied(self.other_course_key, {'step_one': 'abc'})
+        CourseExtensionsState.clear([self.course_key])
+        self.assertEqual(CourseExtensionsState.get_applied_steps(self.course_key), {})
+        self.assertEqual(CourseExtensionsState.get_applied_steps(self.other_course_key), {'step_one': 'abc'})
+        CourseExtensionsState.clear()
+        self.assertFalse(CourseExtensionsState.objects.exists())
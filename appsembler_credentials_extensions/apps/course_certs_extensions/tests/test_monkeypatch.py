@@ -6,6 +6,7 @@ import mock
 
 from django.conf import settings
 from django.test.client import RequestFactory
+from django.test.utils import override_settings
 
 from xblock.fields import Scope, String, XBlockMixin
 from xmodule import course_module
@@ -17,7 +18,7 @@ if hasattr(settings, 'STUDIO_NAME'):  # cms
     from ..helpers import cms_import_helper  # noqa: F402
     cms_import_helper()
 
-from .. import monkeypatch  # noqa: F401
+from .. import monkeypatch
 
 
 class FakeExtensionMixin(XBlockMixin):
@@ -28,8 +29,8 @@ def mock_get_mixins():
     return (FakeExtensionMixin, )
 
 
-@mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.monkeypatch.get_CourseDescriptor_mixins',
-            new=mock_get_mixins)
+@mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.monkeypatch.EXTENSION_FIELD_NAMES',
+            new=('fake_field',))
 class CertsMonkeypatchTestCase(ModuleStoreTestCase):
     """ Tests for monkeypatches in course_certs_extensions app."""
 
@@ -47,3 +48,75 @@ class CertsMonkeypatchTestCase(ModuleStoreTestCase):
         request = RequestFactory().get('dummy')
         webview._update_course_context(request, context, self.course, "platform name")
         self.assertTrue(context['fake_field'] == 'foo')  # context updated with course's new mixin field's value
+
+    def test_extension_field_names(self):
+        """ Verify the extension field names are collected from the course mixin classes."""
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.monkeypatch.'
+                        'get_CourseDescriptor_mixins', new=mock_get_mixins):
+            self.assertEqual(monkeypatch.get_extension_field_names(), ('fake_field',))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_extension_fields_context_cached_per_course_version(self):
+        """ Verify extension field values are read from the course once per published version."""
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.monkeypatch.'
+                        '_get_course_version', return_value='version-1'):
+            self.assertEqual(monkeypatch.get_extension_fields_context(self.course), {'fake_field': 'foo'})
+            self.course.fake_field = 'bar'
+            self.assertEqual(monkeypatch.get_extension_fields_context(self.course), {'fake_field': 'foo'})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_webview_course_context_cached(self):
+        """ Verify the course part of the webview context is built once per course version and configuration."""
+        mock_app_settings = mock.Mock(CACHE_CERTS_WEBVIEW_CONTEXT=True, CERTS_WEBVIEW_CONTEXT_CACHE_TIMEOUT=60)
+        mock_orig = mock.Mock(side_effect=lambda request, context, course, platform_name: context.update(
+            {'course_number': course.number}))
+        request = RequestFactory().get('dummy')
+        with mock.patch.object(monkeypatch, 'app_settings', new=mock_app_settings), \
+                mock.patch.object(monkeypatch, 'orig__update_course_context', new=mock_orig, create=True), \
+                mock.patch.object(monkeypatch, '_get_html_view_configuration_id', return_value=1), \
+                mock.patch.object(monkeypatch, '_get_course_version', return_value='version-1'):
+            for __ in range(2):
+                context = {'certificate_data': {}, 'organization_long_name': '', 'organization_short_name': '',
+                           'user': 'learner'}
+                monkeypatch._update_course_context(request, context, self.course, "platform name")
+                self.assertEqual(context['course_number'], self.course.number)
+                self.assertEqual(context['fake_field'], 'foo')
+                self.assertEqual(context['user'], 'learner')
+        self.assertEqual(mock_orig.call_count, 1)
+
+    def test_webview_course_context_cache_key_per_scheme(self):
+        """ Verify course contexts, which hold absolute URLs, are cached separately for http and https requests."""
+        mock_app_settings = mock.Mock(CACHE_CERTS_WEBVIEW_CONTEXT=True)
+        context = {'certificate_data': {}, 'organization_long_name': '', 'organization_short_name': ''}
+        with mock.patch.object(monkeypatch, 'app_settings', new=mock_app_settings), \
+                mock.patch.object(monkeypatch, '_get_html_view_configuration_id', return_value=1), \
+                mock.patch.object(monkeypatch, '_get_course_version', return_value='version-1'):
+            http_key = monkeypatch._get_course_context_cache_key(
+                RequestFactory().get('dummy'), context, self.course, "platform name")
+            https_key = monkeypatch._get_course_context_cache_key(
+                RequestFactory().get('dummy', secure=True), context, self.course, "platform name")
+        self.assertNotEqual(http_key, https_key)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_webview_organization_context_cached_until_organizations_change(self):
+        """ Verify the organization part of the webview context is built again once organizations change."""
+        mock_app_settings = mock.Mock(CACHE_CERTS_WEBVIEW_CONTEXT=True, CERTS_WEBVIEW_CONTEXT_CACHE_TIMEOUT=60)
+
+        def update_organization_context(context, course):  # pylint: disable=unused-argument
+            context['organization_short_name'] = 'org'
+            context['certificate_data']['organization'] = 'org'  # changed in place
+
+        mock_orig = mock.Mock(side_effect=update_organization_context)
+        with mock.patch.object(monkeypatch, 'app_settings', new=mock_app_settings), \
+                mock.patch.object(monkeypatch, 'orig__update_organization_context', new=mock_orig, create=True), \
+                mock.patch.object(monkeypatch, '_get_course_version', return_value='version-1'):
+            for __ in range(2):
+                context = {'certificate_data': {}, 'user': 'learner'}
+                monkeypatch._update_organization_context(context, self.course)
+                self.assertEqual(context['organization_short_name'], 'org')
+                self.assertEqual(context['certificate_data'], {'organization': 'org'})
+            self.assertEqual(mock_orig.call_count, 1)
+
+            monkeypatch._organizations_changed(sender=None)
+            monkeypatch._update_organization_context({'certificate_data': {}}, self.course)
+            self.assertEqual(mock_orig.call_count, 2)
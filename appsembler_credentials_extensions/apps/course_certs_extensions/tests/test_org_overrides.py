@@ -0,0 +1,78 @@
+"""Tests for per-org HTML view configuration overrides resolved at render time."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+
+from opaque_keys.edx.keys import CourseKey
+
+from .. import org_overrides
+
+
+ORG_OVERRIDES = {'org': {'logo_src': '/static/org-logo.png'}}
+
+
+class OrgOverridesTestCase(TestCase):
+    """ Tests for the precomputed per-org HTML view overrides."""
+
+    def setUp(self):
+        super(OrgOverridesTestCase, self).setUp()
+        self.mock_app_settings = mock.Mock(CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES=ORG_OVERRIDES,
+                                           RESOLVE_CERTS_HTML_VIEW_ORG_OVERRIDES_AT_RENDER=True)
+        patcher = mock.patch.object(org_overrides, 'app_settings', new=self.mock_app_settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_org_overrides_precomputed_and_refreshed(self):
+        """ Verify org overrides are built once, and again if the setting is replaced."""
+        org_overrides.compile_org_html_view_overrides()
+        layer = org_overrides.get_org_html_view_overrides('org')
+        self.assertEqual(layer, {'logo_src': '/static/org-logo.png'})
+        self.assertIs(org_overrides.get_org_html_view_overrides('org'), layer)
+        self.assertEqual(org_overrides.get_org_html_view_overrides('other'), {})
+
+        self.mock_app_settings.CERTS_HTML_VIEW_COURSE_ORG_OVERRIDES = {'org': {'logo_src': '/static/new-logo.png'}}
+        self.assertEqual(org_overrides.get_org_html_view_overrides('org'), {'logo_src': '/static/new-logo.png'})
+
+    def test_org_overrides_applied_at_render(self):
+        """ Verify the certificate webview applies the course org's overrides over the course's own."""
+        from .. import monkeypatch
+
+        course = mock.Mock(id=CourseKey.from_string('course-v1:org+course+run'))
+        context = {'logo_src': '/static/course-logo.png', 'user': 'learner'}
+        with mock.patch.object(monkeypatch, 'orig__render_certificate_template', create=True) as mock_render:
+            monkeypatch._render_certificate_template('request', context, course, 'certificate')
+        mock_render.assert_called_once_with('request', context, course, 'certificate')
+        self.assertEqual(context, {'logo_src': '/static/org-logo.png', 'user': 'learner'})
+
+    def test_render_mode_matches_copy_mode(self):
+        """ Verify org overrides win over values the webview sets after the organization context, as when copied."""
+        from .. import monkeypatch
+
+        course_overrides = {'company_about_url': '/about'}
+        course = mock.Mock(id=CourseKey.from_string('course-v1:org+course+run'),
+                           cert_html_view_overrides=course_overrides)
+        # values set by the header context and user info steps, after the organization context
+        webview_context = {'logo_src': '/static/header-logo.png', 'user': 'learner'}
+
+        # copy mode: the org overrides were copied into the course's overrides on publish
+        copied_overrides = dict(course_overrides)
+        copied_overrides.update(org_overrides.get_org_html_view_overrides('org'))
+        copy_mode_context = dict(webview_context)
+        copy_mode_context.update(copied_overrides)
+
+        # render mode: the webview builds the organization context, sets later values, applies the course's
+        # own overrides, then the patched render applies the org's
+        render_mode_context = {}
+        with mock.patch.object(monkeypatch, 'orig__update_organization_context', create=True), \
+                mock.patch.object(monkeypatch, 'app_settings', new=mock.Mock(CACHE_CERTS_WEBVIEW_CONTEXT=False)):
+            monkeypatch._update_organization_context(render_mode_context, course)
+        render_mode_context.update(webview_context)
+        render_mode_context.update(course_overrides)
+        with mock.patch.object(monkeypatch, 'orig__render_certificate_template', create=True):
+            monkeypatch._render_certificate_template('request', render_mode_context, course, 'certificate')
+
+        self.assertEqual(render_mode_context, copy_mode_context)
+        self.assertEqual(render_mode_context['logo_src'], '/static/org-logo.png')
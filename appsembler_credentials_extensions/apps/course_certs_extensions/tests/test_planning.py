@@ -0,0 +1,73 @@
+"""Tests for planning which courses need per-course setup."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+
+from course_modes.models import CourseMode
+from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
+
+from .. import planning
+
+
+@mock.patch.dict('appsembler_credentials_extensions.apps.course_certs_extensions.planning.settings.FEATURES',
+                 {'CERTIFICATES_HTML_VIEW': True})
+class PlanCoursesTestCase(TestCase):
+    """ Tests for planning course setup from cheap reads."""
+
+    def setUp(self):
+        super(PlanCoursesTestCase, self).setUp()
+        self.mock_app_settings = mock.Mock()
+        self.mock_app_settings.USE_OPEN_ENDED_CERTS_DEFAULTS = True
+        patcher = mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.planning.app_settings',
+                             new=self.mock_app_settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.course_summaries = []
+        patcher = mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.planning.modulestore')
+        patcher.start().return_value.get_course_summaries.side_effect = lambda: self.course_summaries
+        self.addCleanup(patcher.stop)
+
+    def test_plan_reports_needed_checks(self):
+        """ Verify missing course mode and cert display defaults are reported, and set up courses aren't."""
+        needs_setup = CourseOverviewFactory.create(certificates_display_behavior='end', cert_html_view_enabled=False,
+                                                   self_paced=False)
+        set_up = CourseOverviewFactory.create(certificates_display_behavior='early_with_info',
+                                              cert_html_view_enabled=True, has_any_active_web_certificate=True,
+                                              self_paced=False)
+        CourseMode.objects.create(course_id=set_up.id, mode_slug=CourseMode.DEFAULT_MODE_SLUG)
+
+        with mock.patch('appsembler_credentials_extensions.common.pre_publish.get_fingerprints', return_value={}):
+            plan = dict(planning.plan_courses())
+
+        self.assertIn(planning.DEFAULT_COURSE_MODE, plan[needs_setup.id])
+        self.assertIn(planning.CERT_DISPLAY_DEFAULTS, plan[needs_setup.id])
+        self.assertIn(planning.DEFAULT_CERTIFICATE, plan[needs_setup.id])
+        self.assertNotIn(planning.SELF_GENERATED_CERTS, plan[needs_setup.id])
+        self.assertNotIn(planning.DEFAULT_COURSE_MODE, plan.get(set_up.id, []))
+        self.assertNotIn(planning.DEFAULT_CERTIFICATE, plan.get(set_up.id, []))
+
+    def test_plan_given_courses(self):
+        """ Verify only the given courses are planned, replacing certificates if asked to."""
+        overview = CourseOverviewFactory.create()
+        CourseOverviewFactory.create()
+        plan = dict(planning.plan_courses([overview.id], replace=True))
+        self.assertEqual(plan.keys(), [overview.id])
+        self.assertIn(planning.DEFAULT_CERTIFICATE, plan[overview.id])
+
+    def test_iter_course_keys_pages_through_course_overviews(self):
+        """ Verify all course keys are yielded in order, across chunks."""
+        expected = sorted((CourseOverviewFactory.create().id for __ in range(3)), key=unicode)
+        self.assertEqual(list(planning.iter_course_keys(chunk_size=2)), expected)
+
+    def test_courses_without_overview_are_planned(self):
+        """ Verify modulestore courses without a CourseOverview are enumerated and need every check."""
+        overview = CourseOverviewFactory.create()
+        missing = CourseKey.from_string('course-v1:org+missing+run')
+        self.course_summaries = [mock.Mock(id=overview.id), mock.Mock(id=missing)]
+        self.assertEqual(list(planning.iter_course_keys()), [overview.id, missing])
+        with mock.patch('appsembler_credentials_extensions.common.pre_publish.get_fingerprints', return_value={}):
+            self.assertEqual(dict(planning.plan_courses())[missing], list(planning.CHECKS))
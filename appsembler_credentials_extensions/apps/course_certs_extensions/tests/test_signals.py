@@ -10,8 +10,9 @@ import mock
 import os
 
 from django.conf import settings
+from django.test.utils import override_settings
 
-from certificates.models import CertificateGenerationConfiguration
+from certificates.models import CertificateGenerationConfiguration, CertificateGenerationCourseSetting
 from certificates import api as certs_api
 from course_modes.models import CourseMode
 from openedx.core.djangoapps.self_paced.models import SelfPacedConfiguration
@@ -22,6 +23,9 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from appsembler_credentials_extensions.apps.course_certs_extensions import signals
 
 
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
 def certs_feature_enabled(func):
     @wraps(func)
     @mock.patch.dict('appsembler_credentials_extensions.apps.course_certs_extensions.signals.settings.FEATURES',
@@ -130,6 +134,58 @@ class CertsSettingsSignalsTest(LMSCertSignalsTestCase):
             signals.toggle_self_generated_certs(course.id, course.self_paced)
             self.assertTrue(certs_api.cert_generation_enabled(course.id))
 
+    @certs_feature_enabled
+    def test_toggle_self_generated_certs_batch(self):
+        """ Verify self-generated certs are toggled for many courses at once, only writing changes."""
+        instructor_paced = CourseFactory.create(self_paced=False)
+        signals.toggle_self_generated_certs_batch([(unicode(self.course.id), True),
+                                                   (unicode(instructor_paced.id), False)])
+        self.assertTrue(certs_api.cert_generation_enabled(self.course.id))
+        self.assertFalse(certs_api.cert_generation_enabled(instructor_paced.id))
+
+        settings_count = CertificateGenerationCourseSetting.objects.count()
+        self.assertEqual(signals.set_self_generated_certs([(self.course.id, True), (instructor_paced.id, False)]), 0)
+        self.assertEqual(CertificateGenerationCourseSetting.objects.count(), settings_count)
+
+    @certs_feature_enabled
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_self_generated_certs_toggles_are_coalesced(self):
+        """ Verify repeated toggles of a course within the countdown run once, with the latest pacing."""
+        with mock.patch.object(signals.toggle_pending_self_generated_certs, 'apply_async') as mock_apply_async:
+            signals._listen_for_course_pacing_changed('sender', self.course.id, False)
+            signals._listen_for_course_pacing_changed('sender', self.course.id, True)
+            mock_apply_async.assert_called_once_with((unicode(self.course.id),), countdown=mock.ANY,
+                                                     ignore_result=True)
+        self.assertFalse(certs_api.cert_generation_enabled(self.course.id))
+        signals.toggle_pending_self_generated_certs(unicode(self.course.id))
+        self.assertTrue(certs_api.cert_generation_enabled(self.course.id))
+
+    @certs_feature_enabled
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_enable_self_generated_certs_doesnt_load_overview_on_publish(self):
+        """ Verify the course overview is only read by the toggle task, not on publish."""
+        with mock.patch.object(signals.toggle_pending_self_generated_certs, 'apply_async'), \
+                mock.patch.object(signals.CourseOverview, 'get_from_id') as mock_get_from_id:
+            signals.enable_self_generated_certs('store', self.course.id)
+            mock_get_from_id.assert_not_called()
+        signals.toggle_pending_self_generated_certs(unicode(self.course.id))
+        self.assertTrue(certs_api.cert_generation_enabled(self.course.id))
+
+    @certs_feature_enabled
+    def test_enable_self_generated_certs_for_courses_without_overview(self):
+        """ Verify pacings are read in one query, leaving courses without an overview to the task."""
+        signals.CourseOverview.get_from_id(self.course.id)
+        without_overview = CourseFactory.create(self_paced=True)
+        signals.CourseOverview.objects.filter(id=without_overview.id).delete()
+        with mock.patch.object(signals.toggle_self_generated_certs_batch, 'delay') as mock_delay, \
+                mock.patch.object(signals.CourseOverview, 'get_from_id') as mock_get_from_id:
+            signals.enable_self_generated_certs_for_courses([self.course.id, without_overview.id])
+            mock_get_from_id.assert_not_called()
+            mock_delay.assert_called_once_with([(unicode(self.course.id), True), (unicode(without_overview.id), None)])
+
+        signals.toggle_self_generated_certs_batch(mock_delay.call_args[0][0])
+        self.assertTrue(certs_api.cert_generation_enabled(without_overview.id))
+
     @certs_feature_enabled
     def test_default_mode_on_course_pre_publish(self):
         """Verify a CourseMode is created in default mode on course pre-publish.
@@ -139,10 +195,10 @@ class CertsSettingsSignalsTest(LMSCertSignalsTestCase):
         DEFAULT_MODE.min_price = 0
         DEFAULT_MODE.currency = 'usd'
 
-        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.CourseMode.'
-                        'DEFAULT_MODE', new=DEFAULT_MODE):
-            with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.CourseMode.'
-                            'DEFAULT_MODE_SLUG', new='honor'):
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.default_course_mode.'
+                        'CourseMode.DEFAULT_MODE', new=DEFAULT_MODE):
+            with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.default_course_mode.'
+                            'CourseMode.DEFAULT_MODE_SLUG', new='honor'):
                 with self.assertRaises(CourseMode.DoesNotExist):
                     mode = CourseMode.objects.get(course_id=self.course.id, mode_slug='honor',
                                                   mode_display_name='Honor')
@@ -178,6 +234,54 @@ class CertsCreationSignalsTest(BaseCertSignalsTestCase):
         asset_file = "demo-sig1.png"
         signals.store_theme_signature_img_as_asset(self.course.id, asset_file)
 
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
+                new=fake_get_storage_class)
+    def test_store_theme_signature_img_as_asset_skips_unchanged_content(self):
+        """ Verify that an unchanged signature image isn't stored again for the same course
+        """
+        asset_file = "demo-sig1.png"
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.contentstore') \
+                as mock_contentstore:
+            mock_contentstore.return_value.find.return_value.content_digest = signals._get_signature_img_digest(
+                FakeStaticStorage().path(asset_file))
+            path = signals.store_theme_signature_img_as_asset(self.course.id, asset_file)
+            self.assertEqual(signals.store_theme_signature_img_as_asset(self.course.id, asset_file), path)
+            self.assertEqual(mock_contentstore.return_value.save.call_count, 1)
+            mock_contentstore.return_value.find.assert_called_with(mock.ANY, throw_on_not_found=False, as_stream=True)
+
+            other_course = CourseFactory.create()
+            signals.store_theme_signature_img_as_asset(other_course.id, asset_file)
+            self.assertEqual(mock_contentstore.return_value.save.call_count, 2)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
+                new=fake_get_storage_class)
+    def test_store_theme_signature_img_as_asset_restores_deleted_asset(self):
+        """ Verify that a cached signature image is stored again if the asset no longer exists
+        """
+        asset_file = "demo-sig1.png"
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.contentstore') \
+                as mock_contentstore:
+            path = signals.store_theme_signature_img_as_asset(self.course.id, asset_file)
+            mock_contentstore.return_value.find.return_value = None
+            self.assertEqual(signals.store_theme_signature_img_as_asset(self.course.id, asset_file), path)
+            self.assertEqual(mock_contentstore.return_value.save.call_count, 2)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
+                new=fake_get_storage_class)
+    def test_store_theme_signature_img_as_asset_restores_replaced_asset(self):
+        """ Verify that a cached signature image is stored again if the asset was replaced with other content
+        """
+        asset_file = "demo-sig1.png"
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.contentstore') \
+                as mock_contentstore:
+            path = signals.store_theme_signature_img_as_asset(self.course.id, asset_file)
+            mock_contentstore.return_value.find.return_value.content_digest = 'other-digest'
+            self.assertEqual(signals.store_theme_signature_img_as_asset(self.course.id, asset_file), path)
+            self.assertEqual(mock_contentstore.return_value.save.call_count, 2)
+
     @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
                 new=fake_get_storage_class)
     def test_make_default_cert_string(self):
@@ -286,6 +390,55 @@ class CertsCreationSignalsTest(BaseCertSignalsTestCase):
             self.assertEqual(signatories[0]['title'], 'Title from Other Org')
             self.assertEqual(signatories[0]['organization'], 'other organization')
 
+    def test_make_default_certificate_without_json_round_trip(self):
+        """ Verify the default Certificate is built from the certificate data without serializing it
+        """
+        self.mock_app_settings.DEFAULT_CERT_SIGNATORIES = {}
+        self.mock_app_settings.ACTIVATE_DEFAULT_CERTS = True
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.app_settings',
+                        new=self.mock_app_settings), \
+                mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.json') as mock_json:
+            certificate = signals.make_default_certificate(self.course)
+        mock_json.dumps.assert_not_called()
+        self.assertEqual(certificate.certificate_data['name'], 'Default')
+        self.assertTrue(certificate.certificate_data['is_active'])
+        self.assertEqual(certificate.certificate_data['signatories'], [])
+        self.assertIsNotNone(certificate.id)
+
+    @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
+                new=fake_get_storage_class)
+    def test_default_cert_template_compiled_once_per_org(self):
+        """ Verify default certificate templates are compiled once per org and recompiled on config change
+        """
+        self.mock_app_settings.ACTIVATE_DEFAULT_CERTS = False
+        self.mock_app_settings.DEFAULT_CERT_SIGNATORIES = {
+            'default': [{"name": "Name One", "title": "Title", "signature_image_path": "demo-sig1.png"}],
+            'course_org_overrides': {
+                'OtherOrg': [{"name": "Other Name", "title": "Title", "signature_image_path": "demo-sig1.png"}],
+            }
+        }
+        with mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.app_settings',
+                        new=self.mock_app_settings):
+            template = signals.get_default_cert_template(self.course.id.org)
+            self.assertIs(signals.get_default_cert_template(self.course.id.org), template)
+            self.assertFalse(template.is_active)
+            self.assertEqual(dict(template.signatories[0][0])['name'], 'Name One')
+            self.assertEqual(dict(template.signatories[0][0])['organization'], '')
+            self.assertEqual(template.signatories[0][1], 'demo-sig1.png')
+            self.assertEqual(dict(signals.get_default_cert_template('OtherOrg').signatories[0][0])['name'],
+                             'Other Name')
+            # orgs without their own signatories share the default template
+            self.assertIs(signals.get_default_cert_template('ThirdOrg'), template)
+
+            cert_data = signals.make_default_cert_data(self.course.id)
+            self.assertEqual(cert_data['name'], 'Default')
+            self.assertFalse(cert_data['is_active'])
+            self.assertEqual(cert_data['signatories'][0]['name'], 'Name One')
+            self.assertNotEqual(cert_data['signatories'][0]['signature_image_path'], 'demo-sig1.png')
+
+            self.mock_app_settings.ACTIVATE_DEFAULT_CERTS = True
+            self.assertTrue(signals.get_default_cert_template(self.course.id.org).is_active)
+
     @mock.patch('appsembler_credentials_extensions.apps.course_certs_extensions.signals.get_storage_class',
                 new=fake_get_storage_class)
     @certs_feature_enabled
@@ -0,0 +1,64 @@
+"""Tests for bulk course setup throttles."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+
+from ..throttling import RateLimiter, WriteThrottle
+
+
+class FakeClock(object):
+    """Clock advanced only by sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimiterTestCase(TestCase):
+    """ Tests for spacing out course setup."""
+
+    def test_wait_spaces_calls(self):
+        """ Verify calls are spaced by the rate limit interval."""
+        clock = FakeClock()
+        limiter = RateLimiter(4, clock=clock.time, sleep=clock.sleep)
+        for __ in range(5):
+            limiter.wait()
+        self.assertEqual(clock.now, 1.0)
+
+
+class WriteThrottleTestCase(TestCase):
+    """ Tests for limiting and backing off course writes."""
+
+    def test_semaphore_held_during_writes(self):
+        """ Verify the shared semaphore is acquired and released around writes."""
+        semaphore = mock.Mock()
+        with WriteThrottle(semaphore):
+            semaphore.acquire.assert_called_once_with()
+            semaphore.release.assert_not_called()
+        semaphore.release.assert_called_once_with()
+
+    def test_adaptive_backoff(self):
+        """ Verify the throttle backs off while latency is high, and stops once it recovers."""
+        sleep = mock.Mock()
+        throttle = WriteThrottle(adaptive=True, sleep=sleep)
+        for __ in range(10):
+            throttle.record_latency(0.1)
+        sleep.assert_not_called()
+
+        throttle.record_latency(1.0)
+        self.assertTrue(sleep.called)
+        first_backoff = throttle.backoff
+        throttle.record_latency(1.0)
+        self.assertEqual(throttle.backoff, first_backoff * 2)
+
+        for __ in range(50):
+            throttle.record_latency(0.1)
+        self.assertEqual(throttle.backoff, 0)
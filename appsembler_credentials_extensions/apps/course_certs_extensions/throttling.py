@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Throttles for bulk course setup against production stores."""
+
+from __future__ import absolute_import, unicode_literals
+
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter(object):
+    """Space out calls to wait() so they happen at most max_per_second times a second."""
+
+    def __init__(self, max_per_second, clock=time.time, sleep=time.sleep):
+        self.interval = 1.0 / max_per_second
+        self.clock = clock
+        self.sleep = sleep
+        self.next_time = None
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        now = self.clock()
+        if self.next_time is not None and self.next_time > now:
+            self.sleep(self.next_time - now)
+            now = self.next_time
+        self.next_time = now + self.interval
+
+
+class WriteThrottle(object):
+    """
+    Context manager around a unit of writes, like setting up one course.
+
+    Limits how many units run at once across processes if given a shared semaphore,
+    and if adaptive, backs off when the recent latency of whole units, reads included,
+    rises well above its long term average, doubling the pause while latency stays high.
+    """
+
+    FAST_ALPHA = 0.3
+    SLOW_ALPHA = 0.02
+
+    def __init__(self, semaphore=None, adaptive=False, latency_factor=2.0, max_backoff=30.0,
+                 clock=time.time, sleep=time.sleep):
+        self.semaphore = semaphore
+        self.adaptive = adaptive
+        self.latency_factor = latency_factor
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.recent_latency = None
+        self.baseline_latency = None
+        self.backoff = 0
+        self._started = None
+
+    def __enter__(self):
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+        self._started = self.clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = self.clock() - self._started
+        if self.semaphore is not None:
+            self.semaphore.release()
+        if self.adaptive:
+            self.record_latency(elapsed)
+        return False
+
+    def record_latency(self, elapsed):
+        """Update latency averages with a new sample, and pause if units are slowing down."""
+        if self.recent_latency is None:
+            self.recent_latency = self.baseline_latency = elapsed
+            return
+        self.recent_latency += self.FAST_ALPHA * (elapsed - self.recent_latency)
+        self.baseline_latency += self.SLOW_ALPHA * (elapsed - self.baseline_latency)
+
+        if self.recent_latency > self.latency_factor * self.baseline_latency:
+            self.backoff = min(self.max_backoff, self.backoff * 2 if self.backoff else self.recent_latency)
+            logger.info('Setup latency {:.3f}s above baseline {:.3f}s; backing off {:.3f}s'.format(
+                self.recent_latency, self.baseline_latency, self.backoff))
+            self.sleep(self.backoff)
+        else:
+            self.backoff = 0
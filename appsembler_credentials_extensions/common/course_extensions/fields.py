@@ -2,12 +2,16 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import logging
 import traceback
 
 from xblock import warnings
 from xblock.fields import Field, String, Scope, UNSET, UNIQUE_ID
 
 
+logger = logging.getLogger(__name__)
+
+
 class FailingEnforceDefaultValueWarning(DeprecationWarning):
     """
     An exception triggered when a field default value is not among values options.
@@ -20,14 +24,16 @@ class DefaultValueEnforcedField(Field):
 
     # We're OK redefining built-in `help`
     def __init__(self, help=None, default=UNSET, scope=Scope.content,  # pylint:disable=redefined-builtin
-                 display_name=None, values=None, enforce_type=False,
+                 display_name=None, values=None, enforce_type=False, enforce_values=False,
                  xml_node=False, force_export=False, **kwargs):
         self.warned = False
         self.help = help
         self._enable_enforce_type = enforce_type
+        self._enable_enforce_values = enforce_values
         self.scope = scope
         self._display_name = display_name
         self._values = values
+        self._values_index = (None, None)
         if default is not UNSET:
             if default is UNIQUE_ID:
                 self._default = UNIQUE_ID
@@ -44,9 +50,10 @@ class DefaultValueEnforcedField(Field):
         return the result or call it and trigger a silent warning if the result
         is different or a Traceback
         """
-        if value is None or self.values is None:
+        allowed_values = self._allowed_values()
+        if value is None or allowed_values is None:
             return value
-        elif value not in [val['value'] for val in self.values]:
+        elif value not in allowed_values:
             message = "The default value {!r} was not among available values {} ({})".format(
                 value, str(self.values), traceback.format_exc().splitlines()[-1])
             warnings.warn(message, FailingEnforceDefaultValueWarning, stacklevel=3)
@@ -54,6 +61,49 @@ class DefaultValueEnforcedField(Field):
         else:
             return value
 
+    def _allowed_values(self):
+        """
+        Return the set of allowed values, or None if any value is allowed.
+
+        The set is indexed once per values list, and again if the list is replaced.
+        """
+        if callable(self._values):
+            values = self._values()
+            return None if values is None else frozenset(val['value'] for val in values)
+        indexed_values, allowed_values = self._values_index
+        if indexed_values is not self._values:
+            allowed_values = None if self._values is None else frozenset(val['value'] for val in self._values)
+            self._values_index = (self._values, allowed_values)
+        return allowed_values
+
+    def _is_allowed_value(self, value):
+        """Return False if enforce_values is enabled and the value isn't among the allowed values."""
+        if not self._enable_enforce_values or value is None:
+            return True
+        allowed_values = self._allowed_values()
+        return allowed_values is None or value in allowed_values
+
+    def _enforce_value(self, value):
+        """Raise ValueError if enforce_values is enabled and the value isn't among the allowed values."""
+        if not self._is_allowed_value(value):
+            raise ValueError("The value {!r} of field {} was not among available values".format(
+                value, getattr(self, '__name__', self._display_name)))
+        return value
+
+    def from_json(self, value):
+        """
+        Only warn about stored values not among the allowed values, so courses still load
+        after a value is removed from the allowed values.
+        """
+        value = super(DefaultValueEnforcedField, self).from_json(value)
+        if not self._is_allowed_value(value):
+            logger.warning("The stored value %r of field %s was not among available values",
+                           value, getattr(self, '__name__', self._display_name))
+        return value
+
+    def __set__(self, xblock, value):
+        super(DefaultValueEnforcedField, self).__set__(xblock, self._enforce_value(value))
+
 
 class DefaultEnforcedString(DefaultValueEnforcedField, String):
     pass
@@ -6,6 +6,7 @@ from __future__ import absolute_import, unicode_literals
 
 import inspect
 from new import instancemethod
+import weakref
 
 from xblock.fields import Scope, String, Float, XBlockMixin
 from xmodule import course_module, xml_module
@@ -29,6 +30,7 @@ COURSE_INSTRUCTIONAL_METHOD_DEFAULT = settings.COURSE_INSTRUCTIONAL_METHOD_DEFAU
 COURSE_INSTRUCTION_LOCATIONS = settings.COURSE_INSTRUCTION_LOCATIONS
 COURSE_INSTRUCTION_LOCATION_DEFAULT = settings.COURSE_INSTRUCTION_LOCATION_DEFAULT
 ACCREDITATION_CONFERRED_HELP = settings.ACCREDITATION_CONFERRED_HELP
+ENFORCE_COURSE_EXTENSION_FIELD_VALUES = settings.ENFORCE_COURSE_EXTENSION_FIELD_VALUES
 
 # this is included as a mixin in xmodule.course_module.CourseDescriptor
 
@@ -108,52 +110,69 @@ class XMLDefinitionChainingMixin(XBlockMixin):
         # explicitly calls LicenseMixin's add_license_to_xml()
 
         xmlobj = resource_fs  # not really an XML object but first called needs this val.
-        mro = list(inspect.getmro(type(self)))
-        mro.reverse()
-        dont_call_twice = (str(self.__class__),
-                           "<class 'xblock.internal.CourseDescriptorWithMixins'>",  # generated class name
-                           str(course_module.CourseDescriptor),
-                           str(XMLDefinitionChainingMixin),
-                           str(xml_module.XmlParserMixin)
-                           )
-
-        for klass in mro:
-            if str(klass) in dont_call_twice:
-                continue
+        to_xml_chain, _ = _get_xml_definition_chain(type(self))
 
-            if type(getattr(klass, 'definition_to_xml', None)) == instancemethod:
-                try:
-                    xmlobj = klass.definition_to_xml(self, xmlobj)
-                except NotImplementedError:  # some base classes raise this
-                    continue
+        for definition_to_xml in to_xml_chain:
+            try:
+                xmlobj = definition_to_xml(self, xmlobj)
+            except NotImplementedError:  # some base classes raise this
+                continue
 
         return xmlobj
 
     @classmethod
     def definition_from_xml(cls, definition, children):
         """Set field values from Mixin Classes' definition_from_xml methods."""
-        mro = list(inspect.getmro(cls))
-        mro.reverse()
-        dont_call_twice = (str(cls),
-                           "<class 'xblock.internal.CourseDescriptorWithMixins'>",  # generated class name
-                           str(course_module.CourseDescriptor),
-                           str(XMLDefinitionChainingMixin),
-                           str(xml_module.XmlParserMixin)
-                           )
-
-        for klass in mro:
-            if str(klass) in dont_call_twice:
-                continue
+        _, from_xml_chain = _get_xml_definition_chain(cls)
 
-            if type(getattr(klass, 'definition_to_xml', None)) == instancemethod:
-                try:
-                    definition, children = klass.definition_from_xml(definition, children)
-                except NotImplementedError:  # some base classes raise this
-                    continue
+        for definition_from_xml in from_xml_chain:
+            try:
+                definition, children = definition_from_xml(definition, children)
+            except NotImplementedError:  # some base classes raise this
+                continue
 
         return definition, children
 
 
+# definition_to_xml and definition_from_xml chains per class: class -> (bases in mro, to_xml chain, from_xml chain);
+# the mro is stored without the class itself, which would keep the weak key alive
+_xml_definition_chains = weakref.WeakKeyDictionary()
+
+
+def _get_xml_definition_chain(cls):
+    """
+    Return the definition_to_xml methods and definition_from_xml classmethods to chain for a class.
+
+    The chains are resolved from the class's MRO once, and again only if its MRO changes.
+    """
+    cached = _xml_definition_chains.get(cls)
+    if cached is not None and cached[0] == cls.__mro__[1:]:
+        return cached[1], cached[2]
+
+    mro = list(inspect.getmro(cls))
+    mro.reverse()
+    dont_call_twice = (str(cls),
+                       "<class 'xblock.internal.CourseDescriptorWithMixins'>",  # generated class name
+                       str(course_module.CourseDescriptor),
+                       str(XMLDefinitionChainingMixin),
+                       str(xml_module.XmlParserMixin)
+                       )
+
+    to_xml_chain = []
+    from_xml_chain = []
+    for klass in mro:
+        if str(klass) in dont_call_twice:
+            continue
+
+        if type(getattr(klass, 'definition_to_xml', None)) == instancemethod:
+            to_xml_chain.append(klass.definition_to_xml)
+            if hasattr(klass, 'definition_from_xml'):
+                from_xml_chain.append(klass.definition_from_xml)
+
+    _xml_definition_chains[cls] = (cls.__mro__[1:], to_xml_chain, from_xml_chain)
+    return to_xml_chain, from_xml_chain
+
+
 class CreditsMixin(XBlockMixin):
     """Mixin that allows an author to specify a credit provider and a number of credit units."""
 
@@ -162,6 +181,7 @@ class CreditsMixin(XBlockMixin):
         help=_("Name of the entity providing the credit units"),
         values=build_field_values(CREDIT_PROVIDERS),
         default=CREDIT_PROVIDERS_DEFAULT,
+        enforce_values=ENFORCE_COURSE_EXTENSION_FIELD_VALUES,
         scope=Scope.settings,
     )
 
@@ -203,11 +223,13 @@ class InstructionTypeMixin(XBlockMixin):
     Includes method, field of study, and location of instruction
     """
 
-    field_of_study = String(display_name=_("Field of Study"),
-                            help=_("Topic/field classification of the course content"),
-                            values=build_field_values(COURSE_FIELDS_OF_STUDY),
-                            scope=Scope.settings,
-                            )
+    field_of_study = fields.DefaultEnforcedString(
+        display_name=_("Field of Study"),
+        help=_("Topic/field classification of the course content"),
+        values=build_field_values(COURSE_FIELDS_OF_STUDY),
+        enforce_values=ENFORCE_COURSE_EXTENSION_FIELD_VALUES,
+        scope=Scope.settings,
+    )
 
     # we could create course_modes for this, but better to keep this separate.
     instructional_method = fields.DefaultEnforcedString(
@@ -215,6 +237,7 @@ class InstructionTypeMixin(XBlockMixin):
         help=_("Type of instruction; e.g., classroom, self-paced"),
         default=COURSE_INSTRUCTIONAL_METHOD_DEFAULT,
         values=build_field_values(COURSE_INSTRUCTIONAL_METHODS),
+        enforce_values=ENFORCE_COURSE_EXTENSION_FIELD_VALUES,
         scope=Scope.settings,
     )
 
@@ -224,6 +247,7 @@ class InstructionTypeMixin(XBlockMixin):
                "used in a specific physical setting"),
         values=build_field_values(COURSE_INSTRUCTION_LOCATIONS),
         default=COURSE_INSTRUCTION_LOCATION_DEFAULT,
+        enforce_values=ENFORCE_COURSE_EXTENSION_FIELD_VALUES,
         scope=Scope.settings,
     )
 
@@ -23,3 +23,6 @@ COURSE_FIELDS_OF_STUDY = ENV_TOKENS.get("COURSE_FIELDS_OF_STUDY", [])
 COURSE_INSTRUCTIONAL_METHOD_DEFAULT = ENV_TOKENS.get("COURSE_INSTRUCTIONAL_METHOD_DEFAULT", None)
 COURSE_INSTRUCTION_LOCATIONS = ENV_TOKENS.get("COURSE_INSTRUCTION_LOCATIONS", [])
 COURSE_INSTRUCTION_LOCATION_DEFAULT = ENV_TOKENS.get("COURSE_INSTRUCTION_LOCATION_DEFAULT", None)
+
+# reject course extension field values set outside of the configured values
+ENFORCE_COURSE_EXTENSION_FIELD_VALUES = ENV_TOKENS.get("ENFORCE_COURSE_EXTENSION_FIELD_VALUES", False)
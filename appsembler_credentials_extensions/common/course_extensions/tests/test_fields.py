@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Tests for course_extensions custom field types."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+
+from .. import fields, mixins
+
+
+TEST_VALUES = mixins.build_field_values(['Français', 'German'])
+
+
+class DefaultEnforcedStringTestCase(TestCase):
+    """ Tests for fields enforcing their default and, if enabled, their values among allowed values."""
+
+    def test_allowed_values_indexed_once_per_values_list(self):
+        """ Verify the allowed values are indexed once, and again if the values are replaced."""
+        field = fields.DefaultEnforcedString(values=TEST_VALUES, default='German')
+        allowed_values = field._allowed_values()
+        self.assertEqual(allowed_values, {'Français', 'German'})
+        self.assertIs(field._allowed_values(), allowed_values)
+
+        field._values = mixins.build_field_values(['Spanish'])
+        self.assertEqual(field._allowed_values(), {'Spanish'})
+
+    def test_values_only_enforced_if_enabled(self):
+        """ Verify values not among the allowed values are only rejected when enforce_values is set."""
+        field = fields.DefaultEnforcedString(values=TEST_VALUES)
+        self.assertEqual(field._enforce_value('Spanish'), 'Spanish')
+
+        enforcing_field = fields.DefaultEnforcedString(values=TEST_VALUES, enforce_values=True)
+        self.assertEqual(enforcing_field._enforce_value('German'), 'German')
+        self.assertIsNone(enforcing_field._enforce_value(None))
+        with self.assertRaises(ValueError):
+            enforcing_field._enforce_value('Spanish')
+
+    @mock.patch('appsembler_credentials_extensions.common.course_extensions.fields.logger')
+    def test_stored_values_not_enforced(self, mock_logger):
+        """ Verify from_json keeps stored values no longer among the allowed values, with a warning."""
+        enforcing_field = fields.DefaultEnforcedString(values=TEST_VALUES, enforce_values=True)
+        self.assertEqual(enforcing_field.from_json('German'), 'German')
+        mock_logger.warning.assert_not_called()
+        self.assertEqual(enforcing_field.from_json('Spanish'), 'Spanish')
+        self.assertEqual(mock_logger.warning.call_count, 1)
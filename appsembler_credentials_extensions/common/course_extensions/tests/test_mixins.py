@@ -45,6 +45,23 @@ class CourseMixinsTestCase(ModuleStoreTestCase):
             extra_classes = mixins.get_CourseDescriptor_mixins()
             self.assertIn(mixins.InstructionTypeMixin, extra_classes)
 
+    def test_xml_definition_chain_resolved_once_per_class(self):
+        """ Verify the chained definition_to_xml/definition_from_xml methods are resolved once per class."""
+        course_class = type(str('CourseDescriptorWithChaining'),
+                            (course_module.CourseDescriptor, mixins.XMLDefinitionChainingMixin, mixins.CreditsMixin),
+                            {})
+        to_xml_chain, from_xml_chain = mixins._get_xml_definition_chain(course_class)
+        self.assertIn(mixins.CreditsMixin.definition_to_xml, to_xml_chain)
+        self.assertIn(mixins.CreditsMixin.definition_from_xml, from_xml_chain)
+        self.assertNotIn(mixins.XMLDefinitionChainingMixin.definition_to_xml, to_xml_chain)
+
+        with mock.patch.object(mixins.inspect, 'getmro') as mock_getmro:
+            self.assertIs(mixins._get_xml_definition_chain(course_class)[0], to_xml_chain)
+            mock_getmro.assert_not_called()
+
+        # the cached value doesn't refer to its weak key, which would keep the class alive
+        self.assertNotIn(course_class, mixins._xml_definition_chains[course_class][0])
+
     def test_credits_mixin_fields(self):
         """ Verify proper fields are added, field values are correct."""
 
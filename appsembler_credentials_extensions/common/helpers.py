@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the extension apps, without import-time side effects."""
+
+from __future__ import absolute_import, unicode_literals
+
+import hashlib
+import json
+
+
+def make_fingerprint(*parts):
+    """Return a stable digest of JSON-serializable configuration values."""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=unicode)).hexdigest()
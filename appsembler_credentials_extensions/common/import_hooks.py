@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Run callbacks when a module is first imported, to apply monkeypatches lazily.
+
+Patching a module only when something imports it keeps processes which never use
+it, like Celery workers and most management commands, from paying for its import.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import importlib
+import logging
+import sys
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class PostImportFinder(object):
+    """
+    PEP 302 meta path finder which runs registered callbacks after a module is imported.
+
+    It doesn't load anything itself: the module is imported by the regular finders,
+    then the callbacks get the module before any importer sees it.
+    """
+
+    def __init__(self):
+        self._callbacks = {}
+        self._importing = set()
+        self._lock = threading.RLock()
+
+    def register(self, module_name, callback):
+        """Call callback with the module once it is imported, right away if it already is."""
+        with self._lock:
+            module = sys.modules.get(module_name)
+            if module is None:
+                self._callbacks.setdefault(module_name, []).append(callback)
+                return
+        callback(module)
+
+    def find_module(self, fullname, path=None):  # pylint: disable=unused-argument
+        """Claim imports of modules with callbacks, unless already importing them."""
+        with self._lock:
+            if fullname in self._callbacks and fullname not in self._importing:
+                return self
+        return None
+
+    def load_module(self, fullname):
+        """Import the module with the other finders, then run its callbacks."""
+        with self._lock:
+            self._importing.add(fullname)
+        try:
+            module = importlib.import_module(fullname)
+        finally:
+            with self._lock:
+                self._importing.discard(fullname)
+        with self._lock:
+            callbacks = self._callbacks.pop(fullname, [])
+        for callback in callbacks:
+            try:
+                callback(module)
+            except Exception:  # pylint: disable=broad-except
+                # don't fail the import of the module over a patch
+                logger.exception('Post-import callback for {} failed'.format(fullname))
+        return module
+
+
+_finder = PostImportFinder()
+
+
+def when_imported(module_name, callback):
+    """Call callback with the named module when it is first imported, or now if it already is."""
+    if _finder not in sys.meta_path:
+        sys.meta_path.insert(0, _finder)
+    _finder.register(module_name, callback)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Single pre_publish pipeline for course setup steps provided by the extension apps.
+
+Each app registers one or more steps instead of connecting its own receiver to
+``SignalHandler.pre_publish``.  The pipeline receiver loads the course once, runs
+every registered step against that descriptor and persists it at most once.
+
+A step is a callable taking the course descriptor (plus any keyword arguments)
+which mutates the descriptor in place and returns True only if a value actually
+changed, so publishes that change nothing don't write a new course version.
+A step which raises is logged and skipped; the other steps' changes are still written.
+
+A step may also be registered with a fingerprint function returning a digest of
+the configuration it depends on for a course.  Once a step has run, the course
+and fingerprint are recorded (when the course_certs_extensions app, which owns
+the state table, is installed) and the step is skipped on later publishes until
+its configuration changes.  If every step is recorded as applied, the publish
+doesn't load the course at all.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+import logging
+
+from django.apps import apps
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler, modulestore
+
+
+logger = logging.getLogger(__name__)
+
+_registered_steps = OrderedDict()
+
+
+def register_step(name, step, fingerprint=None):
+    """Register a pre_publish step under a unique name.
+
+    Registering the same name again replaces the step but keeps its original position,
+    so reloading a module doesn't change the order steps run in.  ``fingerprint`` is
+    an optional callable taking a course key; steps without one run on every publish.
+    """
+    _registered_steps[name] = (step, fingerprint)
+
+
+def unregister_step(name):
+    """Remove a registered pre_publish step, if present."""
+    _registered_steps.pop(name, None)
+
+
+def get_steps():
+    """Return the registered steps in the order they will run."""
+    return [step for step, _ in _registered_steps.values()]
+
+
+def _registered_steps_items():
+    """Return (name, step) for each registered step, in the order they will run."""
+    return [(name, step) for name, (step, _) in _registered_steps.items()]
+
+
+def get_state_model():
+    """Return the model recording applied steps, or None if its app isn't installed."""
+    try:
+        return apps.get_model('appsembler_course_certs_extensions', 'CourseExtensionsState')
+    except LookupError:
+        return None
+
+
+def set_fields(course, **values):
+    """Set field values on a course, only touching fields whose value differs.
+
+    Returns True if any field was changed.
+    """
+    changed = False
+    for field_name, value in values.items():
+        if getattr(course, field_name) != value:
+            setattr(course, field_name, value)
+            changed = True
+    return changed
+
+
+def update_course(store, course):
+    """Persist a modified course descriptor."""
+    course.save()
+    try:
+        store.update_item(course, course._edited_by)
+    except AttributeError:
+        store.update_item(course, 0)
+
+
+def _run_named_steps(course_key, named_steps, **kwargs):
+    """Load the course once, run each (name, step) against it and write it back at most once.
+
+    A failing step is logged and skipped, and the changes made by the other steps are
+    still written.  Returns a tuple of what run_steps returns and an OrderedDict of the
+    names of failed steps to their exception.
+    """
+    store = modulestore()
+    course = store.get_course(course_key)
+    if course is None:
+        logger.warn('Course {} not found; skipping pre_publish steps'.format(course_key))
+        return None, OrderedDict()
+
+    changed = False
+    failed = OrderedDict()
+    for name, step in named_steps:
+        try:
+            changed = bool(step(course, **kwargs)) or changed
+        except Exception as exc:  # pylint: disable=broad-except
+            # like separate signal receivers, don't lose the other steps' changes over one failure
+            logger.exception('pre_publish step {} failed for course {}'.format(name, course_key))
+            failed[name] = exc
+
+    if changed:
+        update_course(store, course)
+    return changed, failed
+
+
+def run_steps(course_key, steps, **kwargs):
+    """Load the course once, run each step against it and write it back at most once.
+
+    Returns True if the course was written, False if no step changed it and None
+    if the course wasn't found.  Failing steps are logged and don't stop the others.
+    """
+    named_steps = [(getattr(step, '__name__', repr(step)), step) for step in steps]
+    return _run_named_steps(course_key, named_steps, **kwargs)[0]
+
+
+def get_fingerprints(course_key):
+    """Return a dict of step name to config fingerprint for the course, for steps which have one."""
+    return dict(
+        (name, fingerprint(course_key))
+        for name, (_, fingerprint) in _registered_steps.items() if fingerprint is not None
+    )
+
+
+def run_all_steps(course_key, **kwargs):
+    """Run every registered step against the course, whatever was recorded, and record them as applied.
+
+    Steps which fail aren't recorded.  Returns the same as run_steps, after writing the
+    changes of the other steps, or raises the exception of the first failed step.
+    """
+    written, failed = _run_named_steps(course_key, _registered_steps_items(), **kwargs)
+    state_model = get_state_model()
+    if written is not None and state_model:
+        state_model.mark_applied(course_key, dict(
+            (name, value) for name, value in get_fingerprints(course_key).items() if name not in failed
+        ))
+    if failed:
+        raise failed.values()[0]
+    return written
+
+
+@receiver(SignalHandler.pre_publish, dispatch_uid="appsembler_pre_publish_pipeline")
+def run_pre_publish_pipeline(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """Run course setup steps not yet applied for a course being published in Studio."""
+    state_model = get_state_model()
+    applied = state_model.get_applied_steps(course_key) if state_model else {}
+    fingerprints = get_fingerprints(course_key)
+
+    pending_steps = [
+        (name, step) for name, step in _registered_steps_items()
+        if name not in fingerprints or applied.get(name) != fingerprints[name]
+    ]
+    if not pending_steps:
+        return
+
+    written, failed = _run_named_steps(course_key, pending_steps)
+    if written is not None and state_model and fingerprints:
+        state_model.mark_applied(course_key, dict(
+            (name, value) for name, value in fingerprints.items()
+            if applied.get(name) != value and name not in failed
+        ))
@@ -0,0 +1 @@
+"""Tests for common modules."""
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Tests for the common helpers."""
+
+from __future__ import absolute_import, unicode_literals
+
+import datetime
+
+from django.test import SimpleTestCase
+
+from .. import helpers
+
+
+class MakeFingerprintTestCase(SimpleTestCase):
+    """ Tests for digests of configuration values."""
+
+    def test_fingerprint_is_stable_and_cache_key_safe(self):
+        """ Verify equal values give the same digest, with no characters memcached rejects."""
+        version = datetime.datetime(2020, 7, 8, 12, 30)
+        fingerprint = helpers.make_fingerprint('course-v1:org+course+run', version, {'b': 1, 'a': 2})
+        self.assertEqual(fingerprint, helpers.make_fingerprint('course-v1:org+course+run', version, {'a': 2, 'b': 1}))
+        self.assertNotEqual(fingerprint, helpers.make_fingerprint('course-v1:org+course+run', None))
+        self.assertRegexpMatches(fingerprint, r'^[0-9a-f]{40}$')
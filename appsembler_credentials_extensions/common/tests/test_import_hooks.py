@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Tests for running callbacks when a module is first imported."""
+
+from __future__ import absolute_import, unicode_literals
+
+import importlib
+import sys
+
+import mock
+
+from django.test import TestCase
+
+from .. import import_hooks
+
+
+class PostImportFinderTestCase(TestCase):
+    """ Tests for applying patches only when their module is imported."""
+
+    def setUp(self):
+        super(PostImportFinderTestCase, self).setUp()
+        self.finder = import_hooks.PostImportFinder()
+        sys.meta_path.insert(0, self.finder)
+        self.addCleanup(sys.meta_path.remove, self.finder)
+        self.saved_module = sys.modules.pop('colorsys', None)
+        self.addCleanup(self._restore_module)
+
+    def _restore_module(self):
+        sys.modules.pop('colorsys', None)
+        if self.saved_module is not None:
+            sys.modules['colorsys'] = self.saved_module
+
+    def test_callback_runs_on_first_import(self):
+        """ Verify the callback gets the module when it is imported, and not before."""
+        callback = mock.Mock()
+        self.finder.register('colorsys', callback)
+        callback.assert_not_called()
+
+        module = importlib.import_module('colorsys')
+        callback.assert_called_once_with(module)
+        importlib.import_module('colorsys')
+        self.assertEqual(callback.call_count, 1)
+
+    def test_callback_runs_now_if_already_imported(self):
+        """ Verify the callback runs right away for a module which is already imported."""
+        module = importlib.import_module('colorsys')
+        callback = mock.Mock()
+        self.finder.register('colorsys', callback)
+        callback.assert_called_once_with(module)
+
+    def test_failing_callback_doesnt_fail_import(self):
+        """ Verify the module is still imported if its callback raises."""
+        self.finder.register('colorsys', mock.Mock(side_effect=ValueError('boom')))
+        self.assertEqual(importlib.import_module('colorsys').__name__, 'colorsys')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Tests for the common pre_publish pipeline."""
+
+from __future__ import absolute_import, unicode_literals
+
+import mock
+
+from django.test import TestCase
+
+from .. import pre_publish
+
+
+class PrePublishPipelineTestCase(TestCase):
+    """ Tests for running registered pre_publish steps against one course load."""
+
+    def setUp(self):
+        super(PrePublishPipelineTestCase, self).setUp()
+        self.store = mock.Mock()
+        self.course = mock.Mock()
+        self.store.get_course.return_value = self.course
+        patcher = mock.patch('appsembler_credentials_extensions.common.pre_publish.modulestore',
+                             return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_steps_share_one_load_and_one_write(self):
+        """ Verify the course is loaded and written once for all steps."""
+        step_one = mock.Mock(return_value=True)
+        step_two = mock.Mock(return_value=True)
+        self.assertTrue(pre_publish.run_steps('course-v1:org+course+run', [step_one, step_two]))
+        step_one.assert_called_once_with(self.course)
+        step_two.assert_called_once_with(self.course)
+        self.assertEqual(self.store.get_course.call_count, 1)
+        self.assertEqual(self.store.update_item.call_count, 1)
+
+    def test_no_write_when_no_step_changes_course(self):
+        """ Verify the course isn't written if no step reports a change."""
+        self.assertFalse(pre_publish.run_steps('course-v1:org+course+run', [mock.Mock(return_value=False)]))
+        self.store.update_item.assert_not_called()
+
+    def test_failing_step_does_not_lose_other_changes(self):
+        """ Verify the changes of other steps are written when one step raises."""
+        failing = mock.Mock(side_effect=ValueError('invalid certificate'))
+        step = mock.Mock(return_value=True)
+        self.assertTrue(pre_publish.run_steps('course-v1:org+course+run', [failing, step]))
+        step.assert_called_once_with(self.course)
+        self.assertEqual(self.store.update_item.call_count, 1)
+
+    def test_failed_step_is_not_recorded_as_applied(self):
+        """ Verify a failed step is left to run again on the next publish."""
+        state_model = mock.Mock()
+        state_model.get_applied_steps.return_value = {}
+        with mock.patch.object(pre_publish, '_registered_steps', pre_publish.OrderedDict()), \
+                mock.patch.object(pre_publish, 'get_state_model', return_value=state_model):
+            pre_publish.register_step('failing', mock.Mock(side_effect=ValueError), fingerprint=lambda key: 'abc')
+            pre_publish.register_step('working', mock.Mock(return_value=True), fingerprint=lambda key: 'def')
+            pre_publish.run_pre_publish_pipeline('store', 'course-v1:org+course+run')
+            self.assertEqual(self.store.update_item.call_count, 1)
+            state_model.mark_applied.assert_called_once_with('course-v1:org+course+run', {'working': 'def'})
+
+            # setting up a course by command still writes the working step, then reports the failure
+            state_model.mark_applied.reset_mock()
+            with self.assertRaises(ValueError):
+                pre_publish.run_all_steps('course-v1:org+course+run')
+            state_model.mark_applied.assert_called_once_with('course-v1:org+course+run', {'working': 'def'})
+            self.assertEqual(self.store.update_item.call_count, 2)
+
+    def test_register_step_keeps_order(self):
+        """ Verify re-registering a step replaces it in place."""
+        with mock.patch.object(pre_publish, '_registered_steps', pre_publish.OrderedDict()):
+            first, second, replacement = mock.Mock(), mock.Mock(), mock.Mock()
+            pre_publish.register_step('first', first)
+            pre_publish.register_step('second', second)
+            pre_publish.register_step('first', replacement)
+            self.assertEqual(pre_publish.get_steps(), [replacement, second])
+
+    def test_pipeline_skips_steps_applied_under_same_fingerprint(self):
+        """ Verify the course isn't loaded when every step is recorded with a matching fingerprint."""
+        state_model = mock.Mock()
+        state_model.get_applied_steps.return_value = {'first': 'abc'}
+        step = mock.Mock(return_value=True)
+        with mock.patch.object(pre_publish, '_registered_steps', pre_publish.OrderedDict()), \
+                mock.patch.object(pre_publish, 'get_state_model', return_value=state_model):
+            pre_publish.register_step('first', step, fingerprint=lambda course_key: 'abc')
+            pre_publish.run_pre_publish_pipeline('store', 'course-v1:org+course+run')
+            step.assert_not_called()
+            self.store.get_course.assert_not_called()
+
+            # a changed config fingerprint runs the step again and records the new fingerprint
+            pre_publish.register_step('first', step, fingerprint=lambda course_key: 'def')
+            pre_publish.run_pre_publish_pipeline('store', 'course-v1:org+course+run')
+            step.assert_called_once_with(self.course)
+            state_model.mark_applied.assert_called_once_with('course-v1:org+course+run', {'first': 'def'})
@@ -0,0 +1 @@
+"""Performance benchmarks for appsembler_credentials_extensions."""
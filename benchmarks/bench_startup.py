@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the startup cost of appsembler_credentials_extensions.
+
+Each sample runs in a fresh Python process with the test settings, which need no Mongo,
+and measures wall time, resident memory and live object count for these steps:
+
+* import_package: importing the appsembler_credentials_extensions package and its app configs
+* django_setup: the rest of django.setup(), minus the apps' ready()
+* course_certs_ready: AppsemblerCredentialsCourseCertsConfig.ready(), including the first
+  import of common.course_extensions, which its monkeypatch and signals modules import
+* badges_ready: AppsemblerCredentialsBadgesConfig.ready()
+* course_extensions_bases_rewrite: the CourseDescriptor.__bases__ rewrite done by
+  common.course_extensions.monkeypatch on import.  That module is already imported by
+  course_certs_ready, so the rewrite is undone and timed again on its own afterwards;
+  course_certs_ready includes it once as well.
+
+Module imports during the steps are timed by a meta path finder, so results are broken
+down by module.  The finder adds a little overhead to every import it times.
+
+Run from the repository root in an environment with edx-platform installed:
+
+    python -m benchmarks.bench_startup --output startup.json
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import gc
+import imp
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks import utils
+
+
+PACKAGE = 'appsembler_credentials_extensions'
+COURSE_CERTS_APP_CONFIG = PACKAGE + '.apps.course_certs_extensions.apps.AppsemblerCredentialsCourseCertsConfig'
+BADGES_APP_CONFIG = PACKAGE + '.apps.badges_extensions.apps.AppsemblerCredentialsBadgesConfig'
+COURSE_EXTENSIONS_MONKEYPATCH = PACKAGE + '.common.course_extensions.monkeypatch'
+
+# number of modules from outside the package to report, slowest first
+TOP_EXTERNAL_MODULES = 20
+
+
+def current_rss_kb():
+    """Return the resident memory of this process in kB, or its peak if the current one can't be read."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except (IOError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ImportProfiler(object):
+    """
+    Meta path finder timing the first import of each module, attributed to the current step.
+
+    Only claims modules the default importer can find, so failed implicit relative imports
+    still fall back to absolute ones.
+    """
+
+    def __init__(self):
+        self.step = None
+        self.modules = []
+        self._importing = set()
+        self._child_seconds = [0.0]
+
+    def find_module(self, fullname, path=None):
+        if self.step is None or fullname in self._importing:
+            return None
+        try:
+            module_file = imp.find_module(fullname.rpartition('.')[2], path)[0]
+        except ImportError:
+            return None
+        if module_file is not None:
+            module_file.close()
+        return self
+
+    def load_module(self, fullname):
+        self._importing.add(fullname)
+        self._child_seconds.append(0.0)
+        rss_before = current_rss_kb()
+        started = time.time()
+        try:
+            return importlib.import_module(fullname)
+        finally:
+            inclusive = time.time() - started
+            child_seconds = self._child_seconds.pop()
+            self._child_seconds[-1] += inclusive
+            self._importing.discard(fullname)
+            self.modules.append({
+                'module': fullname,
+                'step': self.step,
+                'inclusive_seconds': inclusive,
+                'self_seconds': inclusive - child_seconds,
+                'rss_kb': current_rss_kb() - rss_before,
+            })
+
+
+class StepTimer(object):
+    """Measure steps of startup, attributing module imports to them."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.steps = []
+
+    def measure(self, step, func, *args, **kwargs):
+        """Call func as the named step, record its cost and return its result."""
+        previous_step = self.profiler.step
+        self.profiler.step = step
+        modules_before = len(sys.modules)
+        rss_before = current_rss_kb()
+        objects_before = len(gc.get_objects())
+        started = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.steps.append({
+                'step': step,
+                'seconds': time.time() - started,
+                'rss_kb': current_rss_kb() - rss_before,
+                'objects': len(gc.get_objects()) - objects_before,
+                'modules_imported': len(sys.modules) - modules_before,
+            })
+            self.profiler.step = previous_step
+
+
+def undo_course_descriptor_bases_rewrite():
+    """
+    Undo the CourseDescriptor.__bases__ rewrite of common.course_extensions.monkeypatch.
+
+    Returns the CourseDescriptor class and the bases the module rewrites it to.
+    """
+    course_extensions_monkeypatch = importlib.import_module(COURSE_EXTENSIONS_MONKEYPATCH)
+    course_descriptor = course_extensions_monkeypatch.orig_CourseDescriptor
+    original_bases = course_extensions_monkeypatch.CDbases
+    course_descriptor.__bases__ = original_bases
+    return course_descriptor, course_extensions_monkeypatch.mixins.get_CourseDescriptor_mixins() + original_bases
+
+
+def measure_startup():
+    """Measure one startup in this process and return the steps and per-module results."""
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
+    timer = StepTimer(profiler)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+
+    def import_package():
+        importlib.import_module(PACKAGE)
+        app_config_paths = (COURSE_CERTS_APP_CONFIG, BADGES_APP_CONFIG)
+        return [importlib.import_module(path.rpartition('.')[0]) for path in app_config_paths]
+
+    course_certs_apps, badges_apps = timer.measure('import_package', import_package)
+
+    # time the apps' ready() apart from the rest of django.setup()
+    for name, app_config_class in (('course_certs_ready', course_certs_apps.AppsemblerCredentialsCourseCertsConfig),
+                                   ('badges_ready', badges_apps.AppsemblerCredentialsBadgesConfig)):
+        def timed_ready(self, _ready=app_config_class.ready, _name=name):
+            timer.measure(_name, _ready, self)
+        app_config_class.ready = timed_ready
+
+    import django
+    timer.measure('django_setup', django.setup)
+    course_descriptor, rewritten_bases = undo_course_descriptor_bases_rewrite()
+    timer.measure('course_extensions_bases_rewrite', setattr, course_descriptor, '__bases__', rewritten_bases)
+    sys.meta_path.remove(profiler)
+
+    # the ready() steps ran within django_setup, so take them out of it
+    steps = dict((step['step'], step) for step in timer.steps)
+    for ready_step in ('course_certs_ready', 'badges_ready'):
+        for key in ('seconds', 'rss_kb', 'objects', 'modules_imported'):
+            steps['django_setup'][key] -= steps.get(ready_step, {}).get(key, 0)
+    return {'steps': timer.steps, 'modules': profiler.modules}
+
+
+def summarize(samples):
+    """Return results per step and per module, as the best and mean over the samples."""
+    results = []
+    for step in [step['step'] for step in samples[0]['steps']]:
+        step_samples = [dict((s['step'], s) for s in sample['steps'])[step] for sample in samples]
+        seconds = [s['seconds'] for s in step_samples]
+        results.append({
+            'operation': step,
+            'processes': len(seconds),
+            'best': min(seconds),
+            'mean': sum(seconds) / len(seconds),
+            'rss_kb': sum(s['rss_kb'] for s in step_samples) / len(step_samples),
+            'objects': sum(s['objects'] for s in step_samples) // len(step_samples),
+            'modules_imported': step_samples[0]['modules_imported'],
+        })
+
+    modules = {}
+    for sample in samples:
+        for module in sample['modules']:
+            modules.setdefault(module['module'], []).append(module)
+    module_results = []
+    for name, module_samples in modules.items():
+        inclusive = [m['inclusive_seconds'] for m in module_samples]
+        module_results.append({
+            'module': name,
+            'step': module_samples[0]['step'],
+            'processes': len(inclusive),
+            'best': min(inclusive),
+            'mean': sum(inclusive) / len(inclusive),
+            'self_mean': sum(m['self_seconds'] for m in module_samples) / len(module_samples),
+            'rss_kb': sum(m['rss_kb'] for m in module_samples) / len(module_samples),
+        })
+    module_results.sort(key=lambda result: result['mean'], reverse=True)
+    package_modules = [result for result in module_results if result['module'].startswith(PACKAGE)]
+    external_modules = [result for result in module_results if not result['module'].startswith(PACKAGE)]
+    return results + package_modules + external_modules[:TOP_EXTERNAL_MODULES]
+
+
+def run(quick=False):
+    """Measure startup in several fresh processes and return the summarized results."""
+    samples = []
+    for __ in range(2 if quick else 5):
+        output = subprocess.check_output([sys.executable, '-m', 'benchmarks.bench_startup', '--measure'],
+                                         env=dict(os.environ))
+        samples.append(json.loads(output.splitlines()[-1]))
+    return summarize(samples)
+
+
+def main():
+    if '--measure' in sys.argv:
+        print(json.dumps(measure_startup()))
+        return
+    args = utils.parse_args(__doc__.strip().splitlines()[0])
+    utils.write_results('startup', run(quick=args.quick), args.output)
+
+
+if __name__ == '__main__':
+    main()
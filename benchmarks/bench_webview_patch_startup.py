@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the startup cost the lazy certificates webview patch saves.
+
+Each measurement runs in a fresh Python process, so module imports are cold, and times
+a full django.setup() two ways:
+
+* lazy: as shipped, the course_certs_extensions monkeypatch only registers an import
+  hook for the webview module, which stays unimported
+* eager: django.setup() followed by importing the webview module, which is what
+  patching the webview on startup used to cost every process
+
+The results report both and the time the lazy hook saves.  The webview patch is only
+registered outside Studio, so STUDIO_NAME is removed from the settings before Django is
+set up, which makes the CMS test settings take the LMS code path.  For numbers closer
+to production, set DJANGO_SETTINGS_MODULE to LMS settings.
+
+Run from the repository root in an environment with edx-platform installed:
+
+    python -m benchmarks.bench_webview_patch_startup --output webview_patch_startup.json
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks import utils
+
+
+WEBVIEW_MODULE = 'lms.djangoapps.certificates.views.webview'
+
+# sets Django up in a fresh process, importing the webview if eager, and prints the timings as JSON
+MEASURE_SCRIPT = """
+import json, sys, time
+from django.conf import settings
+if hasattr(settings, 'STUDIO_NAME'):
+    delattr(settings, 'STUDIO_NAME')  # take the LMS code path, where the webview patch is registered
+import django
+started = time.time()
+django.setup()
+setup_seconds = time.time() - started
+webview_imported_by_setup = {webview!r} in sys.modules
+if {eager!r}:
+    import {webview}
+print(json.dumps({{
+    'seconds': time.time() - started,
+    'setup_seconds': setup_seconds,
+    'webview_imported_by_setup': webview_imported_by_setup,
+    'webview_patched': {webview!r} in sys.modules and sys.modules[{webview!r}]._update_course_context.__module__
+                       .startswith('appsembler_credentials_extensions'),
+}}))
+"""
+
+
+def measure_once(eager):
+    """Return the timings of one fresh process, importing the webview after setup if eager."""
+    script = MEASURE_SCRIPT.format(webview=WEBVIEW_MODULE, eager=eager)
+    output = subprocess.check_output([sys.executable, '-c', script], env=dict(os.environ))
+    return json.loads(output.splitlines()[-1])
+
+
+def run(quick=False):
+    """Measure lazy and eager startup over several fresh processes each and return the results."""
+    processes = 2 if quick else 5
+    results = []
+    means = {}
+    for operation, eager in (('lazy_startup', False), ('eager_startup', True)):
+        samples = [measure_once(eager) for __ in range(processes)]
+        timings = [sample['seconds'] for sample in samples]
+        means[operation] = sum(timings) / len(timings)
+        results.append({
+            'operation': operation,
+            'processes': len(timings),
+            'best': min(timings),
+            'mean': means[operation],
+            'webview_imported_by_setup': any(sample['webview_imported_by_setup'] for sample in samples),
+            'webview_patched': all(sample['webview_patched'] for sample in samples) if eager else None,
+        })
+    results.append({
+        'operation': 'lazy_startup_saving',
+        'mean': means['eager_startup'] - means['lazy_startup'],
+    })
+    return results
+
+
+def main():
+    args = utils.parse_args(__doc__.strip().splitlines()[0])
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+    utils.write_results('webview_patch_startup', run(quick=args.quick), args.output)
+
+
+if __name__ == '__main__':
+    main()
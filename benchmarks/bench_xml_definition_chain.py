@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark definition_to_xml/definition_from_xml round trips through XMLDefinitionChainingMixin.
+
+Synthetic courses get the course_extensions mixins through get_CourseDescriptor_mixins(),
+with a stand-in for SequenceDescriptor that exports and imports a chapter element per
+child, so no modulestore or other external service is needed.
+
+Run from the repository root in an environment with edx-platform installed:
+
+    python -m benchmarks.bench_xml_definition_chain --output xml_definition_chain.json
+"""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+from lxml import etree
+
+from benchmarks import utils
+
+
+COURSE_SIZES = (10, 100, 1000)
+
+
+def make_course_class():
+    """
+    Return a course descriptor class with the course_extensions mixins as bases.
+
+    Like the course_extensions monkeypatch does for CourseDescriptor, the mixins come before
+    the sequence stand-in, and the course's definition_to_xml/definition_from_xml defer to them.
+    """
+    from xblock.core import XBlock
+    from xblock.fields import Integer, Scope
+
+    from appsembler_credentials_extensions.common.course_extensions import mixins
+    from appsembler_credentials_extensions.common.course_extensions import settings as course_extensions_settings
+
+    class BenchSequenceDescriptor(XBlock):
+        """Stand-in for SequenceDescriptor, exporting a chapter element per child."""
+
+        num_children = Integer(default=0, scope=Scope.content)
+
+        def definition_to_xml(self, resource_fs):  # pylint: disable=unused-argument
+            xml_object = etree.Element('course')
+            for index in range(self.num_children):
+                etree.SubElement(xml_object, 'chapter', url_name='chapter_{}'.format(index))
+            return xml_object
+
+        @classmethod
+        def definition_from_xml(cls, definition, children):
+            return definition, children + [child.get('url_name') for child in definition]
+
+    course_extensions_settings.ENABLE_CREDITS_EXTRA_FIELDS = True
+    course_extensions_settings.ENABLE_INSTRUCTION_TYPE_EXTRA_FIELDS = True
+    bases = mixins.get_CourseDescriptor_mixins() + (BenchSequenceDescriptor,)
+
+    def definition_to_xml(self, resource_fs):
+        return super(course_class, self).definition_to_xml(resource_fs)
+
+    def definition_from_xml(cls, definition, children):
+        return super(course_class, cls).definition_from_xml(definition, children)
+
+    course_class = type(str('BenchCourseDescriptor'), bases, {
+        'definition_to_xml': definition_to_xml,
+        'definition_from_xml': classmethod(definition_from_xml),
+    })
+    return course_class
+
+
+def make_course(course_class, num_children):
+    """Return a course of the class with num_children chapters and the mixin fields set."""
+    from xblock.field_data import DictFieldData
+    from xblock.fields import ScopeIds
+    from xblock.test.tools import TestRuntime
+
+    runtime = TestRuntime(services={'field-data': DictFieldData({})})
+    scope_ids = ScopeIds('bench', 'course', 'course_definition', 'course_usage')
+    course = course_class(runtime, scope_ids=scope_ids)
+    course.num_children = num_children
+    course.credit_provider = 'Bench Provider'
+    course.credits = 3.0
+    course.credit_unit = 'hours'
+    course.accreditation_conferred = 'Bench accreditation'
+    course.field_of_study = 'Benchmarking'
+    course.instructional_method = 'Online'
+    course.instruction_location = 'Bench Campus'
+    return course
+
+
+def run(quick=False):
+    """Time export, import and round trips at each course size and return the results."""
+    course_class = make_course_class()
+    results = []
+    for num_children in COURSE_SIZES:
+        course = make_course(course_class, num_children)
+        xml_string = etree.tostring(course.definition_to_xml(None))
+        number = max(1, (100 if quick else 2000) // num_children)
+
+        def export():
+            return etree.tostring(course.definition_to_xml(None))
+
+        def import_():
+            return course_class.definition_from_xml(etree.fromstring(xml_string), [])
+
+        def round_trip():
+            return course_class.definition_from_xml(etree.fromstring(export()), [])
+
+        for operation, func in (('definition_to_xml', export), ('definition_from_xml', import_),
+                                ('round_trip', round_trip)):
+            result = utils.time_call(func, number, repeat=3 if quick else 5)
+            result.update({'operation': operation, 'course_size': num_children})
+            results.append(result)
+    return results
+
+
+def main():
+    args = utils.parse_args(__doc__.strip().splitlines()[0])
+    utils.setup_django()
+    utils.write_results('xml_definition_chain', run(quick=args.quick), args.output)
+
+
+if __name__ == '__main__':
+    main()
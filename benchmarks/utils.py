@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Helpers to time benchmarks and report their results as JSON."""
+
+from __future__ import absolute_import, print_function, unicode_literals
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+
+def setup_django():
+    """Set up Django with the test settings, unless settings are already configured."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'test_settings')
+    import django
+    django.setup()
+
+
+def time_call(func, number, repeat=5):
+    """Return timings in seconds per call of func, as a dict of best and mean over repeat runs of number calls."""
+    timings = [total / number for total in timeit.repeat(func, number=number, repeat=repeat)]
+    return {
+        'iterations': number,
+        'repeat': repeat,
+        'best': min(timings),
+        'mean': sum(timings) / len(timings),
+    }
+
+
+def parse_args(description):
+    """Parse the common benchmark command line options."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--output', default=None, help='File to write the JSON results to, instead of stdout')
+    parser.add_argument('--quick', action='store_true', help='Run fewer iterations, e.g. as a smoke test')
+    return parser.parse_args()
+
+
+def write_results(benchmark, results, output=None):
+    """Write benchmark results as JSON, with the Python version they were measured on."""
+    report = {
+        'benchmark': benchmark,
+        'python': platform.python_version(),
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()